@@ -1,8 +1,11 @@
+import time
 import numpy as np
 from copy import deepcopy
 from heapq import heappush, heappop
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
+from symmetry import canonical_key
+from stability import stable_counts
 
 @dataclass
 class SearchNode:
@@ -104,35 +107,60 @@ class OthelloState:
                 
         return value
 
+    def stability(self):
+        """確定石の数の差（黒 - 白）"""
+        black = int.from_bytes(np.packbits(self.board == 1, bitorder='little').tobytes(), 'little')
+        white = int.from_bytes(np.packbits(self.board == -1, bitorder='little').tobytes(), 'little')
+        stable_black, stable_white = stable_counts(black, white)
+        return stable_black - stable_white
+
 class OthelloAI:
-    def __init__(self, player):
+    def __init__(self, player, max_nodes=None, stability_weight=0, max_time=None):
         self.player = player
+        # 展開するノード数の上限（達したら最良の候補の最初の手を返す）
+        self.max_nodes = max_nodes
+        # 思考時間の上限（秒）。達したときはノード数の上限と同じく最良の候補の最初の手を返す
+        self.max_time = max_time
+        # ヒューリスティックに加える確定石の数の差の重み（0 なら数えない）
+        self.stability_weight = stability_weight
+        self.nodes = 0
     
     def get_move(self, state):
         return self.a_star_search(state)
     
     def a_star_search(self, initial_state, max_depth=4):
+        self.nodes = 0
+        deadline = time.perf_counter() + self.max_time if self.max_time is not None else None
         start_node = SearchNode(0, 0, initial_state, [])
         frontier = []
         heappush(frontier, start_node)
         explored = set()
+        # 取り出した中で最も f の小さい候補の最初の手。終局間際で候補が尽きたときに返す
+        best_f = float('inf')
+        best_move = None
         
         while frontier:
             current_node = heappop(frontier)
             current_state = current_node.state
             g_score = current_node.g_score
             path = current_node.path
+            if path and current_node.f_score < best_f:
+                best_f, best_move = current_node.f_score, path[0]
             
-            if g_score >= max_depth:
+            if (g_score >= max_depth or (self.max_nodes is not None and self.nodes >= self.max_nodes)
+                    or (deadline is not None and time.perf_counter() >= deadline)):
                 if path:
                     return path[0]
-                return None
+                if g_score >= max_depth:
+                    return best_move
             
-            state_hash = str(current_state.board.tobytes())
+            # 対称な局面（回転・反転）は同一視する
+            state_hash = (canonical_key(current_state.board)[0], g_score % 2)
             if state_hash in explored:
                 continue
                 
             explored.add(state_hash)
+            self.nodes += 1
             
             moves = current_state.get_valid_moves(self.player if g_score % 2 == 0 else -self.player)
             
@@ -143,12 +171,16 @@ class OthelloAI:
                     continue
                     
                 new_path = path + [move] if not path else path
-                h_score = -next_state.evaluate() if self.player == -1 else next_state.evaluate()
+                value = next_state.evaluate()
+                if self.stability_weight:
+                    value += self.stability_weight * next_state.stability()
+                h_score = -value if self.player == -1 else value
                 new_f_score = g_score + 1 + h_score
                 
                 heappush(frontier, SearchNode(new_f_score, g_score + 1, next_state, new_path))
         
-        return None
+        # 根に合法手がなければ None になる
+        return best_move
 
 def print_board(state):
     symbols = {0: ".", 1: "●", -1: "○"}
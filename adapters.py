@@ -0,0 +1,175 @@
+from position import Position, signed_player
+
+# 各アルゴリズムを battle.py の盤面（position.Position またはリストのリスト, 1: 黒, 2: 白）で呼び出すためのアダプター
+# Position の各形式（読み取り専用）をそのまま渡すので、手ごとの変換や複製はしない
+# エンジンのモジュールは選択されたときに初めて読み込むよう、各 __init__ でインポートする
+# node_budget を指定すると時間や深さの代わりに探索ノード数で打ち切り、結果が再現可能になる
+# 各アダプターは set_clock で対局時計の残り時間を受け取り、1手ごとの思考時間を決める（ClockedAdapter, time_manager.py）
+
+class ClockedAdapter:
+    """対局時計の残り時間を受け取り、TimeManager で1手ごとの (目安, 上限) の思考時間を決める"""
+    clock = None
+    time_manager = None
+
+    def set_clock(self, remaining, increment):
+        """次の手の前に残り持ち時間を受け取る"""
+        if self.time_manager is None:
+            from time_manager import TimeManager
+            self.time_manager = TimeManager()
+            self.start_clock()
+        self.clock = (remaining, increment)
+
+    def start_clock(self):
+        """最初に時計を受け取ったときに、固定の深さや回数の代わりに時間で打ち切るよう切り替える"""
+
+    def allocate(self, position, legal_moves):
+        return self.time_manager.allocate(*self.clock, position.empty_count(), legal_moves)
+
+class AI1Adapter(ClockedAdapter):
+    def __init__(self, time_limit, node_budget=None):
+        from minimax1 import OthelloBoard as Board1, OthelloAI as AI1
+        # 盤面を差し替えて使い回す（OthelloAI.get_move が探索用に複製する）
+        self.board = Board1()
+        if node_budget is None:
+            self.ai = AI1(max_depth=4, max_time=float(time_limit))
+        else:
+            self.ai = AI1(max_depth=64, max_nodes=node_budget)
+        # 一度でも時間切れになったか（なければ結果は決定的）
+        self.hit_time_limit = False
+
+    def start_clock(self):
+        self.ai.max_depth = 64
+
+    def get_move(self, board, player):
+        position = Position.wrap(board)
+        self.board.board = position.rows
+        if self.clock is not None:
+            legal_moves = len(self.board.get_valid_moves(player))
+            self.ai.soft_time, self.ai.max_time = self.allocate(position, legal_moves)
+        move = self.ai.get_move(self.board, player)
+        self.hit_time_limit |= self.ai.timed_out
+        return move
+
+    def analyze(self, board, player):
+        """最善手・評価値（手番から見た値）・読み筋を返す"""
+        move = self.get_move(board, player)
+        return {'move': move, 'score': self.ai.last_score, 'pv': self.ai.last_pv or ([move] if move else [])}
+
+class AI2Adapter(ClockedAdapter):
+    def __init__(self, time_limit, node_budget=None):
+        from minimax2 import OthelloGame as Board2, MinimaxAI as AI2
+        # 盤面を差し替えて使い回す（探索では子局面ごとに複製される）
+        self.game = Board2()
+        self.ai = AI2(3, max_nodes=node_budget)  # depth=3
+
+    def get_move(self, board, player):
+        game = self.game
+        position = Position.wrap(board)
+        game.board = position.array
+        game.current_player = player
+        moves = game.get_valid_moves()
+        if not moves:
+            return None
+        if self.clock is not None:
+            # 時計があるときは深さ1から順に深くし、配分された時間で打ち切る
+            if len(moves) == 1:
+                return moves[0]
+            self.ai.soft_time, self.ai.max_time = self.allocate(position, len(moves))
+        try:
+            move = self.ai.choose_move(moves, game)
+            print(f"AI2 selected move: {move}")
+            return move
+        except Exception as e:
+            print(f"AI2 error: {e}")
+            if moves:
+                print("Falling back to first available move")
+                return moves[0]
+            return None
+
+    def analyze(self, board, player):
+        """最善手・評価値（手番から見た値）・読み筋を返す"""
+        move = self.get_move(board, player)
+        score = self.ai.last_score if move is not None else None
+        if score is not None and player == 2:
+            score = -score
+        return {'move': move, 'score': score, 'pv': [move] if move else []}
+
+class AI4Adapter(ClockedAdapter):
+    def __init__(self, time_limit, node_budget=None):
+        from A_star import OthelloState as Board4, OthelloAI as AI4
+        self.board_class = Board4
+        self.ai_class = AI4
+        self.time_limit = float(time_limit)
+        self.node_budget = node_budget
+
+    def get_move(self, board, player):
+        try:
+            # A*の期待する形式（黒: 1, 白: -1）の盤面。OthelloState.make_move は複製してから打つ
+            ai = self.ai_class(player=signed_player(player), max_nodes=self.node_budget)
+            position = Position.wrap(board)
+            state = self.board_class(position.signed)
+
+            # 有効な手があるか確認
+            valid_moves = state.get_valid_moves(signed_player(player))
+            if not valid_moves:
+                print("A* reports no valid moves")
+                return None
+
+            # 手を取得
+            if self.clock is not None:
+                # A* は途中で区切れないので、目安の時間を探索の上限にする
+                if len(valid_moves) == 1:
+                    return valid_moves[0]
+                ai.max_time, _ = self.allocate(position, len(valid_moves))
+                move = ai.a_star_search(state, max_depth=64)
+            elif self.node_budget is None:
+                move = ai.get_move(state)
+            else:
+                move = ai.a_star_search(state, max_depth=64)
+            print(f"A* suggested move: {move}")
+
+            if move and len(move) == 2:
+                return move
+            else:
+                print("A* returned invalid move format")
+                return valid_moves[0] if valid_moves else None
+
+        except Exception as e:
+            print(f"Error in A* adapter: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+class AI5Adapter(ClockedAdapter):
+    def __init__(self, time_limit, node_budget=None, capacity=500000):
+        from monte_carlo import MCTS
+        # 予算指定時はプレイアウト数で打ち切り、乱数を固定して再現可能にする
+        # capacity は探索木のノード数の上限（1ノード19バイト）
+        self.ai = MCTS(time_limit=float(time_limit), max_playouts=node_budget, capacity=capacity,
+                       seed=0 if node_budget is not None else None)
+
+    def start_clock(self):
+        # プレイアウト数の上限があると時間を見ないので外す
+        self.ai.max_playouts = None
+
+    def get_move(self, board, player):
+        # Position のビットボードをそのまま使う（色の番号は MCTS 側では区別しない）
+        position = Position.wrap(board)
+        own, opp = (position.black, position.white) if player == 1 else (position.white, position.black)
+        if self.clock is not None:
+            from monte_carlo import legal_moves
+            moves = legal_moves(own, opp)
+            if moves and moves & (moves - 1) == 0:
+                # 合法手が1つなら探索しない
+                return divmod(moves.bit_length() - 1, 8)
+            # プレイアウトはいつ止めてもよいので目安の時間だけ探索する
+            self.ai.time_limit, _ = self.allocate(position, moves.bit_count())
+        return self.ai.search(own, opp)
+
+class AI5ParallelAdapter(AI5Adapter):
+    """ルート並列のモンテカルロ木探索（workers を省略すると全コアを使う）"""
+
+    def __init__(self, time_limit, node_budget=None, capacity=500000, workers=None):
+        from monte_carlo import ParallelMCTS
+        self.ai = ParallelMCTS(time_limit=float(time_limit), max_playouts=node_budget, workers=workers,
+                               capacity=capacity, seed=0 if node_budget is not None else None)
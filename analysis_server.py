@@ -0,0 +1,182 @@
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from engines import create_engine, get_engine_info
+
+# 局面解析サービス
+# POST /analyze  {"board": 8x8 (0: 空, 1: 黒, 2: 白), "player": 1 | 2,
+#                 "engine": "minimax1", "time_limit": 1.0, "nodes": null}
+#   -> {"move": [r, c] | null, "score": 数値 | null, "pv": [[r, c], ...], "cached": bool}
+# POST /batch    {"positions": [上と同じ形式, ...]} -> {"results": [...]}
+# GET  /stats    キャッシュの統計
+# 要求の誤りは 400、エンジンの失敗（ワーカーの異常終了を含む）は 500 で {"error": ...} を返す
+
+
+class EngineError(Exception):
+    """ワーカーでの解析の失敗（要求の誤りとは区別して 500 で返す）"""
+
+
+def analyze_position(engine: str, board, player: int, time_limit: float, nodes: Optional[int]) -> dict:
+    """ワーカープロセスで1局面を解析する"""
+    if nodes is not None:
+        ai = create_engine(engine, time_limit, node_budget=nodes)
+    else:
+        ai = create_engine(engine, time_limit)
+    if hasattr(ai, 'analyze'):
+        result = ai.analyze(board, player)
+    else:
+        move = ai.get_move(board, player)
+        result = {'move': move, 'score': None, 'pv': [move] if move else []}
+    return {
+        'move': [int(v) for v in result['move']] if result['move'] is not None else None,
+        'score': float(result['score']) if result['score'] is not None else None,
+        'pv': [[int(v) for v in move] for move in result['pv'] if move is not None],
+    }
+
+
+class LRUCache:
+    """局面の解析結果を保持する LRU キャッシュ（スレッドセーフ）"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result) -> None:
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+
+class AnalysisService:
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 100000):
+        self.pool = ProcessPoolExecutor(workers)
+        self.cache = LRUCache(cache_size)
+
+    @staticmethod
+    def _parse(request: dict) -> Tuple[str, list, int, float, Optional[int]]:
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        engine = get_engine_info(request.get('engine', 'minimax1')).name
+        board = request['board']
+        if (not isinstance(board, list) or len(board) != 8
+                or any(not isinstance(row, list) or len(row) != 8 for row in board)):
+            raise ValueError("board must be 8x8")
+        if any(type(cell) is not int or cell not in (0, 1, 2) for row in board for cell in row):
+            raise ValueError("board cells must be 0, 1 or 2")
+        player = int(request.get('player', 1))
+        if player not in (1, 2):
+            raise ValueError("player must be 1 or 2")
+        nodes = request.get('nodes')
+        return engine, board, player, float(request.get('time_limit', 1.0)), \
+            int(nodes) if nodes is not None else None
+
+    def analyze_batch(self, requests: list) -> list:
+        if not isinstance(requests, list):
+            raise ValueError("positions must be a list")
+        parsed = [self._parse(request) for request in requests]
+        results = [None] * len(parsed)
+        pending = []
+        for i, (engine, board, player, time_limit, nodes) in enumerate(parsed):
+            # 盤面そのものをキーにする（回転・反転した局面では評価値の等しい手のどれを選ぶかが
+            # 変わりうるので、対称形はまとめない）
+            key = (engine, tuple(map(tuple, board)), player, time_limit, nodes)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = dict(cached, cached=True)
+            else:
+                future = self.pool.submit(analyze_position, engine, board, player, time_limit, nodes)
+                pending.append((i, key, future))
+        for i, key, future in pending:
+            try:
+                result = future.result()
+            except Exception as e:
+                raise EngineError(f"{type(e).__name__}: {e}") from e
+            self.cache.put(key, result)
+            results[i] = dict(result, cached=False)
+        return results
+
+    def stats(self) -> dict:
+        return {'cache_entries': len(self.cache.entries), 'hits': self.cache.hits, 'misses': self.cache.misses}
+
+
+def make_handler(service: AnalysisService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send(200, service.stats())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if self.path == '/analyze':
+                    self._send(200, service.analyze_batch([request])[0])
+                elif self.path == '/batch':
+                    self._send(200, {'results': service.analyze_batch(request['positions'])})
+                else:
+                    self._send(404, {'error': 'not found'})
+            except EngineError as e:
+                self._send(500, {'error': str(e)})
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="オセロ局面解析サービス（HTTP/JSON）")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    service = AnalysisService(args.workers, args.cache_size)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
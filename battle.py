@@ -1,265 +1,144 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
+import argparse
+import json
+import os
 import time
-import copy
-import random
-from typing import List, Tuple, Optional
-import numpy as np
-from collections import defaultdict
-
-# 各アルゴリズムのクラスをインポート
-from minimax1 import OthelloBoard as Board1, OthelloAI as AI1
-from minimax2 import OthelloGame as Board2, MinimaxAI as AI2
-from A_star import OthelloState as Board4, OthelloAI as AI4
-from monte_carlo import Othello as Board5
+from typing import Callable, List, Optional, Tuple
+
+# エンジンは engines.py のレジストリから名前で生成する（選択されたものだけ読み込まれる）
+from engines import available_engines, create_engine, get_engine_info
+from referee import GameState
+from time_manager import GameClock, parse_clock
 
 class TimeoutException(Exception):
     pass
 
-# AIアダプタークラス
-class AI1Adapter:
-    def __init__(self, time_limit):
-        self.ai = AI1(max_depth=4, max_time=float(time_limit))
-        
-    def get_move(self, board, player):
-        board_copy = Board1()
-        board_copy.board = copy.deepcopy(board)
-        return self.ai.get_move(board_copy, player)
-
-class AI2Adapter:
-    def __init__(self, time_limit):
-        self.ai = AI2(3)  # depth=3
-        
-    def get_move(self, board, player):
-        game = Board2()
-        game.board = np.array(board)
-        game.current_player = player
-        moves = game.get_valid_moves()
-        if not moves:
-            return None
-        try:
-            move = self.ai.choose_move(moves, game)
-            print(f"AI2 selected move: {move}")
-            return move
-        except Exception as e:
-            print(f"AI2 error: {e}")
-            if moves:
-                print("Falling back to first available move")
-                return moves[0]
-            return None
-
-class AI4Adapter:
-    def __init__(self, time_limit):
-        self.time_limit = float(time_limit)
-        
-    def get_move(self, board, player):
-        try:
-            # ボードをnumpy配列に変換
-            numpy_board = np.array(board)
-            # プレイヤーの値を1/-1に変換（A*の期待する形式）
-            numpy_board = np.where(numpy_board == 2, -1, numpy_board)
-            
-            # A*アルゴリズムのインスタンスを作成
-            ai = AI4(player=1 if player == 1 else -1)
-            state = Board4(numpy_board)
-            
-            # 有効な手があるか確認
-            valid_moves = state.get_valid_moves(1 if player == 1 else -1)
-            if not valid_moves:
-                print("A* reports no valid moves")
-                return None
-                
-            # 手を取得
-            move = ai.get_move(state)
-            print(f"A* suggested move: {move}")
-            
-            if move and len(move) == 2:
-                return move
-            else:
-                print("A* returned invalid move format")
-                return valid_moves[0] if valid_moves else None
-                
-        except Exception as e:
-            print(f"Error in A* adapter: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-
-class AI5Adapter:
-    def __init__(self, time_limit):
-        self.game = Board5()
-        
-    def get_move(self, board, player):
-        self.game.board = copy.deepcopy(board)
-        legal_moves = self.game.get_legal_moves(player)
-        if not legal_moves:
-            return None
-        x, y = random.choice(legal_moves)
-        return (x, y)
-
-class TournamentSystem:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("オセロトーナメントシステム")
-        self.setup_gui()
+class ResultCache:
+    """決定的なエンジン同士の対局結果を (エンジン設定, 開始局面) をキーに保存する
+
+    ファイルには1局ごとに [キー, 結果] を JSON の1行として追記する（書き込みは対局数に比例し、
+    途中で中断されても最後の行が欠けるだけで済む）。読み込み時は壊れた行を無視する。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.results = {}
+        self.hits = 0
+        # 中断で最後の行が欠けていたら、次の追記を新しい行から始める
+        self.partial_line = False
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    self.partial_line = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, list) and len(entry) == 2:
+                        self.results[entry[0]] = entry[1]
+
+    @staticmethod
+    def make_key(black_config: str, white_config: str, board: list, player: int) -> str:
+        position = "".join(str(cell) for row in board for cell in row)
+        return f"{black_config}|{white_config}|{position}|{player}"
+
+    def get(self, key: str) -> Optional[dict]:
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        self.results[key] = result
+        if self.path is not None:
+            with open(self.path, 'a') as f:
+                if self.partial_line:
+                    f.write("\n")
+                    self.partial_line = False
+                f.write(json.dumps([key, result]) + "\n")
+
+class Tournament:
+    """対局とトーナメントの実行部（GUIに依存しない）"""
+
+    def __init__(self, time_limit: float = 5.0,
+                 on_board_update: Optional[Callable[[list], None]] = None,
+                 openings: Optional[List[List[Tuple[int, int]]]] = None,
+                 cache: Optional[ResultCache] = None,
+                 node_budget: Optional[int] = None,
+                 profiler: Optional[object] = None,
+                 db: Optional[object] = None,
+                 clock: Optional[Tuple[float, float]] = None):
+        self.time_limit = time_limit
+        # 対局時計 (持ち時間, 1手ごとの加算)。指定するとエンジンは set_clock で受け取った残り時間から
+        # 1手の思考時間を決め、持ち時間を使い切った側は時間切れ負けになる
+        # （set_clock を持たないエンジンは時計を無視してしまうので対局させない）
+        self.clock = clock
+        # 1手あたりの探索ノード数（プレイアウト数）の上限。指定すると時間制限の代わりに使う
+        self.node_budget = node_budget
+        # get_move を計測するプロファイラ（profiling.py）
+        self.profiler = profiler
+        # 各対局ペアの開始局面にする序盤の手順（openings.py で作る）
+        self.openings = openings
+        # 決定的な対局の結果キャッシュ
+        self.cache = cache
+        # 対局結果と集計の保存先（results_db.ResultsDB、指定がなければメモリ上のデータベース）
+        if db is None:
+            from results_db import ResultsDB
+            db = ResultsDB()
+        self.db = db
+        self.tournament_id = None
+        # 1手ごとに盤面を受け取るコールバック（GUIの描画用）
+        self.on_board_update = on_board_update
         self.match_results = []
         self.current_match = 0
         self.total_matches = 0
 
-    def setup_gui(self):
-        # メインフレーム
-        main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # アルゴリズム選択部分
-        ttk.Label(main_frame, text="アルゴリズム1:").grid(row=0, column=0, sticky=tk.W)
-        self.algo1 = ttk.Combobox(main_frame, values=[
-            "Minimax1",
-            "Minimax2",
-            "A*探索",
-            "モンテカルロ"
-        ])
-        self.algo1.grid(row=0, column=1, sticky=(tk.W, tk.E))
-        self.algo1.set("Minimax1")
-        
-        ttk.Label(main_frame, text="アルゴリズム2:").grid(row=1, column=0, sticky=tk.W)
-        self.algo2 = ttk.Combobox(main_frame, values=[
-            "Minimax1",
-            "Minimax2",
-            "A*探索",
-            "モンテカルロ"
-        ])
-        self.algo2.grid(row=1, column=1, sticky=(tk.W, tk.E))
-        self.algo2.set("Minimax2")
-        
-        # 思考時間制限設定
-        ttk.Label(main_frame, text="思考時間制限 (秒):").grid(row=2, column=0, sticky=tk.W)
-        self.time_limit = ttk.Entry(main_frame)
-        self.time_limit.insert(0, "5")
-        self.time_limit.grid(row=2, column=1, sticky=(tk.W, tk.E))
-        
-        # 対戦回数設定
-        ttk.Label(main_frame, text="対戦回数:").grid(row=3, column=0, sticky=tk.W)
-        self.match_count = ttk.Entry(main_frame)
-        self.match_count.insert(0, "10")
-        self.match_count.grid(row=3, column=1, sticky=(tk.W, tk.E))
-        
-        # 開始ボタン
-        ttk.Button(main_frame, text="トーナメント開始", command=self.start_tournament).grid(row=4, column=0, columnspan=2)
-        
-        # 盤面表示用キャンバス
-        self.canvas = tk.Canvas(main_frame, width=400, height=400, bg='green')
-        self.canvas.grid(row=5, column=0, columnspan=2, pady=10)
-        
-        # 情報表示用ラベル
-        self.info_label = ttk.Label(main_frame, text="")
-        self.info_label.grid(row=6, column=0, columnspan=2)
-        
-        # 統計情報表示用
-        self.stats_label = ttk.Label(main_frame, text="")
-        self.stats_label.grid(row=7, column=0, columnspan=2)
-
     def create_ai(self, algo_name: str) -> object:
-        time_limit = self.time_limit.get()
-        if algo_name == "Minimax1":
-            return AI1Adapter(time_limit)
-        elif algo_name == "Minimax2":
-            return AI2Adapter(time_limit)
-        elif algo_name == "A*探索":
-            return AI4Adapter(time_limit)
-        else:  # Monte Carlo
-            return AI5Adapter(time_limit)
-
-    def draw_board(self, board: list):
-        self.canvas.delete("all")
-        cell_size = 50
-        
-        # 盤面の罫線を描画
-        for i in range(9):
-            self.canvas.create_line(i * cell_size, 0, i * cell_size, 400, fill='black')
-            self.canvas.create_line(0, i * cell_size, 400, i * cell_size, fill='black')
-            
-        # 石を描画
-        for i in range(8):
-            for j in range(8):
-                x = j * cell_size + cell_size // 2
-                y = i * cell_size + cell_size // 2
-                if board[i][j] == 1:  # 黒
-                    self.canvas.create_oval(x-20, y-20, x+20, y+20, fill='black')
-                elif board[i][j] == 2:  # 白
-                    self.canvas.create_oval(x-20, y-20, x+20, y+20, fill='white')
-
-    def is_valid_move(self, row: int, col: int, board: list, player: int) -> bool:
-        if board[row][col] != 0:
-            return False
-            
-        directions = [(0,1), (1,0), (0,-1), (-1,0), (1,1), (-1,-1), (1,-1), (-1,1)]
-        opponent = 3 - player
-        
-        for dx, dy in directions:
-            x, y = row + dx, col + dy
-            if not (0 <= x < 8 and 0 <= y < 8) or board[x][y] != opponent:
-                continue
-                
-            x, y = x + dx, y + dy
-            while 0 <= x < 8 and 0 <= y < 8:
-                if board[x][y] == 0:
-                    break
-                if board[x][y] == player:
-                    return True
-                x, y = x + dx, y + dy
-        return False
-
-    def make_move(self, row: int, col: int, board: list, player: int) -> bool:
-        if not self.is_valid_move(row, col, board, player):
-            return False
-            
-        board[row][col] = player
-        directions = [(0,1), (1,0), (0,-1), (-1,0), (1,1), (-1,-1), (1,-1), (-1,1)]
-        opponent = 3 - player
-        
-        for dx, dy in directions:
-            x, y = row + dx, col + dy
-            to_flip = []
-            
-            while 0 <= x < 8 and 0 <= y < 8 and board[x][y] == opponent:
-                to_flip.append((x, y))
-                x, y = x + dx, y + dy
-                
-            if 0 <= x < 8 and 0 <= y < 8 and board[x][y] == player:
-                for flip_x, flip_y in to_flip:
-                    board[flip_x][flip_y] = player
-                    
-        return True
-
-    def has_valid_moves(self, board: list, player: int) -> bool:
-        return any(self.is_valid_move(i, j, board, player) 
-                  for i in range(8) for j in range(8))
-
-    def play_single_game(self, black_ai: object, white_ai: object) -> dict:
-        def is_board_full():
-            return all(cell != 0 for row in board for cell in row)
-
-        board = [[0] * 8 for _ in range(8)]
-        # 初期配置
-        board[3][3] = board[4][4] = 2  # 白
-        board[3][4] = board[4][3] = 1  # 黒
-        
+        if self.node_budget is not None:
+            ai = create_engine(algo_name, self.time_limit, node_budget=self.node_budget)
+        else:
+            ai = create_engine(algo_name, self.time_limit)
+        if self.clock is not None and not hasattr(ai, 'set_clock'):
+            raise ValueError(f"{algo_name} does not support a game clock (no set_clock)")
+        if self.profiler is not None:
+            ai = self.profiler.wrap(ai, algo_name)
+        return ai
+
+    def engine_config(self, algo_name: str) -> str:
+        if self.clock is not None:
+            return f"{algo_name}~{self.clock[0]}+{self.clock[1]}"
+        if self.node_budget is not None:
+            return f"{algo_name}#{self.node_budget}"
+        return f"{algo_name}@{self.time_limit}"
+
+    def start_position(self, start_moves: Optional[List[Tuple[int, int]]]) -> Tuple[GameState, int]:
+        """初期局面から start_moves を打った局面と次の手番を返す"""
+        return GameState.from_moves(start_moves)
+
+    def play_single_game(self, black_ai: object, white_ai: object,
+                         start_moves: Optional[List[Tuple[int, int]]] = None) -> dict:
+        # 石数・空きマス・合法手は GameState が差分更新するので毎手の全体走査は不要
+        state, first_player = self.start_position(start_moves)
+        board = state.board
+        # 白番から始まる場合は履歴の偶数番目が白の手になる
+        offset = first_player - 1
+
         moves_history = []
         times_history = []
         consecutive_passes = 0
-        
+        clock = GameClock(*self.clock) if self.clock is not None else None
+        time_forfeit = None
+
         while True:
-            current_ai = black_ai if len(moves_history) % 2 == 0 else white_ai
-            player = 1 if len(moves_history) % 2 == 0 else 2
-            
+            current_ai = black_ai if (len(moves_history) + offset) % 2 == 0 else white_ai
+            player = 1 if (len(moves_history) + offset) % 2 == 0 else 2
+
             # 盤面が全て埋まっているか確認
-            if is_board_full():
+            if state.is_full():
                 print("Game over - board is full")
                 break
 
             # 有効な手があるか確認
-            if not self.has_valid_moves(board, player):
+            if not state.has_moves(player):
                 print(f"Player {player} has no valid moves (pass)")
                 consecutive_passes += 1
                 if consecutive_passes >= 2:
@@ -268,140 +147,232 @@ class TournamentSystem:
                 moves_history.append(None)
                 times_history.append(0)
                 continue
-            
+
+            if clock is not None:
+                current_ai.set_clock(clock.remaining[player], clock.increment)
             start_time = time.time()
             try:
-                move = current_ai.get_move(board, player)
+                # エンジンには審判の Position をそのまま渡す（各形式は読み取り専用）
+                move = current_ai.get_move(state.position, player)
                 end_time = time.time()
-                
+                if clock is not None and clock.charge(player, end_time - start_time):
+                    print(f"Player {player} lost on time")
+                    times_history.append(end_time - start_time)
+                    time_forfeit = player
+                    break
+
                 if move is None:
                     print(f"Player {player} returned None as move")
                     consecutive_passes += 1
                     moves_history.append(None)
                     times_history.append(end_time - start_time)
                     continue
-                
+
                 print(f"Move received: {move}")
-                if self.is_valid_move(move[0], move[1], board, player):
+                if state.is_legal(move, player):
                     print(f"Applying move {move} for player {player}")
-                    self.make_move(move[0], move[1], board, player)
+                    state.play(move, player)
                     consecutive_passes = 0
                     moves_history.append(move)
                     times_history.append(end_time - start_time)
-                    
+
                     # 盤面の状態を出力
-                    black_count = sum(row.count(1) for row in board)
-                    white_count = sum(row.count(2) for row in board)
-                    print(f"Current score - Black: {black_count}, White: {white_count}")
+                    print(f"Current score - Black: {state.counts[1]}, White: {state.counts[2]}")
                 else:
                     print(f"Invalid move {move} suggested by player {player}")
                     consecutive_passes += 1
                     moves_history.append(None)
                     times_history.append(end_time - start_time)
                     continue
-                
+
             except Exception as e:
                 print(f"Error occurred for player {player}: {e}")
                 import traceback
                 traceback.print_exc()
                 end_time = time.time()
+                if clock is not None and clock.charge(player, end_time - start_time):
+                    print(f"Player {player} lost on time")
+                    times_history.append(end_time - start_time)
+                    time_forfeit = player
+                    break
                 consecutive_passes += 1
                 moves_history.append(None)
                 times_history.append(end_time - start_time)
                 continue
-            
+
             # GUI更新
-            self.draw_board(board)
-            self.root.update()
-            time.sleep(0.1)
-        
+            if self.on_board_update is not None:
+                self.on_board_update(board)
+
         # ゲーム終了時のスコア計算
-        black_score = sum(row.count(1) for row in board)
-        white_score = sum(row.count(2) for row in board)
+        black_score = state.counts[1]
+        white_score = state.counts[2]
+        if time_forfeit is not None:
+            # 時間切れ負けは 0 対 64 として記録する
+            black_score, white_score = (0, 64) if time_forfeit == 1 else (64, 0)
         print(f"Game finished - Final score - Black: {black_score}, White: {white_score}")
-        
-        return {
+
+        result = {
             'black_score': black_score,
             'white_score': white_score,
             'moves': moves_history,
-            'times': times_history
+            'times': times_history,
+            'first_player': first_player
         }
+        if time_forfeit is not None:
+            result['time_forfeit'] = time_forfeit
+        return result
+
+    def play_or_cached(self, black_name: str, white_name: str,
+                       start_moves: Optional[List[Tuple[int, int]]] = None) -> dict:
+        """決定的なエンジン同士で同じ開始局面の対局が済んでいれば結果を使い回す"""
+        # 対局時計では思考時間が実行環境に依存するのでキャッシュしない
+        cacheable = (self.cache is not None and self.clock is None
+                     and get_engine_info(black_name).deterministic
+                     and get_engine_info(white_name).deterministic)
+        if cacheable:
+            state, player = self.start_position(start_moves)
+            key = ResultCache.make_key(self.engine_config(black_name), self.engine_config(white_name),
+                                       state.board, player)
+            result = self.cache.get(key)
+            if result is not None:
+                print("Cached result reused")
+                # 思考時間は以前の実行のものなので、記録するときに集計から除く印を付ける
+                return dict(result, cached=True)
+
+        # エンジンはキャッシュになかったときだけ作る
+        black_ai = self.create_ai(black_name)
+        white_ai = self.create_ai(white_name)
+        result = self.play_single_game(black_ai, white_ai, start_moves)
 
-    def start_tournament(self):
-        algo1_name = self.algo1.get()
-        algo2_name = self.algo2.get()
-        match_count = int(self.match_count.get())
+        # 時間切れで探索を打ち切ったエンジンは結果が再現しないのでキャッシュしない
+        if cacheable and not (getattr(black_ai, 'hit_time_limit', False)
+                              or getattr(white_ai, 'hit_time_limit', False)):
+            self.cache.put(key, result)
+        return result
+
+    def run(self, algo1_name: str, algo2_name: str, match_count: int,
+            on_match_start: Optional[Callable[[int, int], None]] = None,
+            on_stats: Optional[Callable[[object, int], None]] = None) -> int:
+        """algo1 と algo2 を match_count 回対戦させ、結果を記録したトーナメントの ID を返す"""
         self.total_matches = match_count
-        
-        results = defaultdict(int)
-        total_times = defaultdict(list)
-        
+        self.tournament_id = self.db.start_tournament(
+            f"{self.engine_config(algo1_name)} vs {self.engine_config(algo2_name)}")
+
         for i in range(match_count):
             # 1回おきに先手後手を入れ替え
             if i % 2 == 0:
-                black_ai = self.create_ai(algo1_name)
-                white_ai = self.create_ai(algo2_name)
                 first_player = algo1_name
                 second_player = algo2_name
             else:
-                black_ai = self.create_ai(algo2_name)
-                white_ai = self.create_ai(algo1_name)
                 first_player = algo2_name
                 second_player = algo1_name
-                
+            # 序盤集があれば、先手後手を入れ替えた2局ごとに次の序盤から始める
+            start_moves = self.openings[(i // 2) % len(self.openings)] if self.openings else None
+
             self.current_match = i + 1
-            self.info_label.config(text=f"対戦 {i+1}/{match_count} 実行中...")
-            self.root.update()
-            
+            if on_match_start is not None:
+                on_match_start(i + 1, match_count)
+
             try:
-                result = self.play_single_game(black_ai, white_ai)
-                
-                # 結果を記録
-                if result['black_score'] > result['white_score']:
-                    winner = first_player
-                elif result['white_score'] > result['black_score']:
-                    winner = second_player
-                else:
-                    winner = 'draw'
-                    
-                results[winner] += 1
-                
-                # 思考時間を記録
-                if i % 2 == 0:
-                    total_times[algo1_name].extend(result['times'][::2])  # 黒の手番の時間
-                    total_times[algo2_name].extend(result['times'][1::2])  # 白の手番の時間
-                else:
-                    total_times[algo2_name].extend(result['times'][::2])  # 黒の手番の時間
-                    total_times[algo1_name].extend(result['times'][1::2])  # 白の手番の時間
-                
+                result = self.play_or_cached(first_player, second_player, start_moves)
+
+                # 結果を記録（集計はデータベース側で差分更新される）
+                self.db.record_game(self.tournament_id, first_player, second_player, result, start_moves)
+
                 # 統計情報を更新
-                self.update_stats(results, total_times)
-                
+                if on_stats is not None:
+                    on_stats(self.db, self.tournament_id)
+
             except Exception as e:
                 print(f"Match error: {e}")
                 continue
-            
-        messagebox.showinfo("完了", "トーナメントが終了しました")
-
-    def update_stats(self, results: dict, times: dict):
-        stats_text = f"結果統計:\n"
-        total_games = sum(results.values())
-        
-        if total_games > 0:
-            for algo in [self.algo1.get(), self.algo2.get()]:
-                win_rate = (results[algo] / total_games) * 100 if algo in results else 0
-                avg_time = sum(times[algo]) / len(times[algo]) if times[algo] else 0
-                stats_text += f"{algo}: 勝率 {win_rate:.1f}%, 平均思考時間 {avg_time:.3f}秒\n"
-                
-            if 'draw' in results and results['draw'] > 0:
-                draw_rate = (results['draw'] / total_games) * 100
-                stats_text += f"引き分け: {draw_rate:.1f}%\n"
-            
-        self.stats_label.config(text=stats_text)
-
-    def run(self):
-        self.root.mainloop()
+
+        return self.tournament_id
+
+def format_stats(db: object, tournament: int, algo_names: List[str]) -> str:
+    stats_text = f"結果統計:\n"
+    standings = db.standings(tournament)
+    # 1局はエンジンごとに1回ずつ数えられている
+    total_games = sum(summary['games'] for summary in standings.values()) // 2
+
+    if total_games > 0:
+        for algo in dict.fromkeys(algo_names):
+            summary = standings.get(algo)
+            if summary is None:
+                continue
+            stats_text += f"{get_engine_info(algo).label}: 勝率 {summary['wins'] / total_games * 100:.1f}%, "
+            percentiles = db.latency_percentiles(algo, tournament, (50, 90))
+            if percentiles:
+                stats_text += (f"平均思考時間 {summary['avg_time']:.3f}秒"
+                               f" (p50 {percentiles[50]:.3f}秒, p90 {percentiles[90]:.3f}秒)")
+            else:
+                # キャッシュの結果だけなら今回の思考時間はない
+                stats_text += "思考時間なし（キャッシュの結果のみ）"
+            stats_text += "\n"
+
+        draws = standings[algo_names[0]]['draws']
+        if algo_names[0] == algo_names[1]:
+            draws //= 2
+        if draws > 0:
+            stats_text += f"引き分け: {draws / total_games * 100:.1f}%\n"
+    return stats_text
+
+def main():
+    parser = argparse.ArgumentParser(description="オセロトーナメントシステム")
+    parser.add_argument('--headless', action='store_true', help="GUIを使わずに対戦する")
+    parser.add_argument('--algo1', default="minimax1")
+    parser.add_argument('--algo2', default="minimax2")
+    parser.add_argument('--time-limit', type=float, default=5.0, help="思考時間制限 (秒)")
+    parser.add_argument('--games', type=int, default=10, help="対戦回数")
+    parser.add_argument('--clock', default=None,
+                        help="対局時計 \"持ち時間[+1手ごとの加算]\"（秒、例: 60+1）。時間切れは負け")
+    parser.add_argument('--nodes', type=int, default=None,
+                        help="1手あたりの探索ノード数の上限（時間制限の代わりに使い、結果が再現可能になる）")
+    parser.add_argument('--openings', default=None, help="序盤集のファイル（openings.py で作る）")
+    parser.add_argument('--cache', default=None, help="決定的な対局結果のキャッシュファイル")
+    parser.add_argument('--db', default=None, help="対局結果を保存する SQLite データベース（results_db.py で集計できる。"
+                             "GUI では省略すると battle_gui.py と同じディレクトリの tournament_results.db）")
+    parser.add_argument('--profile', choices=['sample', 'cprofile'], default=None,
+                        help="エンジンごとに get_move をプロファイルする")
+    parser.add_argument('--profile-dir', default="profile", help="プロファイル結果の出力先")
+    parser.add_argument('--list', action='store_true', help="登録されているエンジンを表示する")
+    args = parser.parse_args()
+
+    if args.list:
+        for info in available_engines():
+            print(f"{info.name:12} {info.label:10} {info.description}")
+        return
+
+    if not args.headless:
+        # tkinter はGUIモードのときだけ読み込む
+        from battle_gui import TournamentSystem
+        TournamentSystem(args.db).run()
+        return
+
+    algo_names = [get_engine_info(args.algo1).name, get_engine_info(args.algo2).name]
+    openings = None
+    if args.openings is not None:
+        from openings import load_suite
+        openings = load_suite(args.openings)
+    profiler = None
+    if args.profile is not None:
+        from profiling import create_profiler
+        profiler = create_profiler(args.profile)
+    db = None
+    if args.db is not None:
+        from results_db import ResultsDB
+        db = ResultsDB(args.db)
+    tournament = Tournament(args.time_limit, openings=openings, cache=ResultCache(args.cache),
+                            node_budget=args.nodes, profiler=profiler, db=db,
+                            clock=parse_clock(args.clock) if args.clock is not None else None)
+    tournament_id = tournament.run(algo_names[0], algo_names[1], args.games)
+    print(format_stats(tournament.db, tournament_id, algo_names))
+    tournament.db.close()
+    if profiler is not None:
+        profiler.close()
+        profiler.write_reports(args.profile_dir)
+        print(f"profiles written to {args.profile_dir}")
 
 if __name__ == "__main__":
-    tournament = TournamentSystem()
-    tournament.run()
\ No newline at end of file
+    main()
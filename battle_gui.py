@@ -0,0 +1,116 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+import time
+from typing import Optional
+
+from battle import ResultCache, Tournament, format_stats
+from engines import available_engines, get_engine_info
+from results_db import ResultsDB
+
+# 対局結果のデータベースの既定の保存先（実行したディレクトリではなくこのファイルの隣）
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tournament_results.db")
+
+class TournamentSystem:
+    def __init__(self, db_path: Optional[str] = None):
+        self.root = tk.Tk()
+        self.root.title("オセロトーナメントシステム")
+        self.setup_gui()
+        # 同じ設定でトーナメントを繰り返したときに決定的な対局を再計算しない
+        self.result_cache = ResultCache()
+        # 対局結果はウィンドウを閉じても残るようにファイルに保存する
+        self.results_db = ResultsDB(db_path or DEFAULT_DB_PATH)
+
+    def setup_gui(self):
+        # メインフレーム
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # アルゴリズム選択部分（レジストリに登録されたエンジンの表示名）
+        engine_labels = [info.label for info in available_engines()]
+        ttk.Label(main_frame, text="アルゴリズム1:").grid(row=0, column=0, sticky=tk.W)
+        self.algo1 = ttk.Combobox(main_frame, values=engine_labels)
+        self.algo1.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.algo1.set("Minimax1")
+
+        ttk.Label(main_frame, text="アルゴリズム2:").grid(row=1, column=0, sticky=tk.W)
+        self.algo2 = ttk.Combobox(main_frame, values=engine_labels)
+        self.algo2.grid(row=1, column=1, sticky=(tk.W, tk.E))
+        self.algo2.set("Minimax2")
+
+        # 思考時間制限設定
+        ttk.Label(main_frame, text="思考時間制限 (秒):").grid(row=2, column=0, sticky=tk.W)
+        self.time_limit = ttk.Entry(main_frame)
+        self.time_limit.insert(0, "5")
+        self.time_limit.grid(row=2, column=1, sticky=(tk.W, tk.E))
+
+        # 対戦回数設定
+        ttk.Label(main_frame, text="対戦回数:").grid(row=3, column=0, sticky=tk.W)
+        self.match_count = ttk.Entry(main_frame)
+        self.match_count.insert(0, "10")
+        self.match_count.grid(row=3, column=1, sticky=(tk.W, tk.E))
+
+        # 開始ボタン
+        ttk.Button(main_frame, text="トーナメント開始", command=self.start_tournament).grid(row=4, column=0, columnspan=2)
+
+        # 盤面表示用キャンバス
+        self.canvas = tk.Canvas(main_frame, width=400, height=400, bg='green')
+        self.canvas.grid(row=5, column=0, columnspan=2, pady=10)
+
+        # 情報表示用ラベル
+        self.info_label = ttk.Label(main_frame, text="")
+        self.info_label.grid(row=6, column=0, columnspan=2)
+
+        # 統計情報表示用
+        self.stats_label = ttk.Label(main_frame, text="")
+        self.stats_label.grid(row=7, column=0, columnspan=2)
+
+    def draw_board(self, board: list):
+        self.canvas.delete("all")
+        cell_size = 50
+
+        # 盤面の罫線を描画
+        for i in range(9):
+            self.canvas.create_line(i * cell_size, 0, i * cell_size, 400, fill='black')
+            self.canvas.create_line(0, i * cell_size, 400, i * cell_size, fill='black')
+
+        # 石を描画
+        for i in range(8):
+            for j in range(8):
+                x = j * cell_size + cell_size // 2
+                y = i * cell_size + cell_size // 2
+                if board[i][j] == 1:  # 黒
+                    self.canvas.create_oval(x-20, y-20, x+20, y+20, fill='black')
+                elif board[i][j] == 2:  # 白
+                    self.canvas.create_oval(x-20, y-20, x+20, y+20, fill='white')
+
+    def show_board(self, board: list):
+        # GUI更新
+        self.draw_board(board)
+        self.root.update()
+        time.sleep(0.1)
+
+    def show_match_start(self, match: int, match_count: int):
+        self.info_label.config(text=f"対戦 {match}/{match_count} 実行中...")
+        self.root.update()
+
+    def start_tournament(self):
+        algo1_name = get_engine_info(self.algo1.get()).name
+        algo2_name = get_engine_info(self.algo2.get()).name
+        match_count = int(self.match_count.get())
+        tournament = Tournament(float(self.time_limit.get()), on_board_update=self.show_board,
+                                cache=self.result_cache, db=self.results_db)
+        tournament.run(algo1_name, algo2_name, match_count,
+                       on_match_start=self.show_match_start, on_stats=self.update_stats)
+        messagebox.showinfo("完了", "トーナメントが終了しました")
+
+    def update_stats(self, db: ResultsDB, tournament: int):
+        algo_names = [get_engine_info(self.algo1.get()).name, get_engine_info(self.algo2.get()).name]
+        self.stats_label.config(text=format_stats(db, tournament, algo_names))
+
+    def run(self):
+        self.root.mainloop()
+
+if __name__ == "__main__":
+    tournament = TournamentSystem()
+    tournament.run()
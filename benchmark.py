@@ -0,0 +1,383 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Tuple
+
+from notation import str_to_move
+from openings import play_opening
+from position import Position, signed_player
+
+# 性能の回帰を検出するベンチマーク
+# 固定した局面（序盤・中盤・終盤）でエンジンごとに次の値を測り、基準値のファイルと比べる
+#   movegen_per_sec  合法手生成の回数/秒（エンジン自身の盤面表現で）
+#   nodes_per_sec    ノード数で打ち切った探索のノード/秒（monte_carlo はプレイアウト/秒）
+#   fixed_depth_sec  決まった深さまでの探索時間（monte_carlo は決まったプレイアウト数）
+#   peak_memory      その探索中に確保されたメモリの最大値（バイト、tracemalloc）
+# 基準値は何回か計測した中央値で、指標ごとに計測の間のばらつき（ノイズの幅）も記録する。
+# 比較ではしきい値にそのノイズの幅を足した分を超えて悪化した指標だけを回帰とする。
+
+POSITIONS = {
+    'opening': "f5f4f3f6d3f2g6c3",
+    'midgame': "f5f4f3f6d3f2g6c3b3b2g4g3b1d2c4c5f1g2g1g5c6a1h6a2b5c7f7d6c2h5",
+    'endgame': "f5f4f3f6d3f2g6c3b3b2g4g3b1d2c4c5f1g2g1g5c6a1h6a2b5c7f7d6c2h5"
+               "b8e7d1a4a3g7h4e3e6h1d8e1e8b4f8h2c1h8",
+}
+
+# 値が大きいほど良い指標（それ以外は小さいほど良い）
+HIGHER_IS_BETTER = {'movegen_per_sec', 'nodes_per_sec'}
+
+DEFAULT_CONFIG = {
+    'node_budget': 2000,
+    'minimax1_depth': 4,
+    'minimax2_depth': 3,
+    'astar_depth': 4,
+    'playouts': 300,
+}
+
+
+def load_positions() -> Dict[str, Tuple[Position, int]]:
+    positions = {}
+    for name, text in POSITIONS.items():
+        moves = [str_to_move(text[i:i + 2]) for i in range(0, len(text), 2)]
+        rows, player = play_opening(moves)
+        positions[name] = (Position(rows), player)
+    return positions
+
+
+class EngineBench(ABC):
+    """1つのエンジンについて、局面ごとに計測する処理を作る"""
+
+    @abstractmethod
+    def movegen(self, position: Position, player: int) -> Callable[[], object]:
+        pass
+
+    @abstractmethod
+    def budget_search(self, position: Position, player: int, config: dict) -> Callable[[], int]:
+        """探索して展開したノード数を返す関数"""
+
+    @abstractmethod
+    def depth_search(self, position: Position, player: int, config: dict) -> Callable[[], object]:
+        pass
+
+
+class Minimax1Bench(EngineBench):
+    def board(self, position):
+        from minimax1 import OthelloBoard
+        board = OthelloBoard()
+        board.board = [list(row) for row in position.rows]
+        return board
+
+    def movegen(self, position, player):
+        board = self.board(position)
+        return lambda: board.get_valid_moves(player)
+
+    def budget_search(self, position, player, config):
+        from minimax1 import OthelloAI
+        board = self.board(position)
+
+        def run():
+            ai = OthelloAI(max_depth=64, max_nodes=config['node_budget'])
+            ai.get_move(board, player)
+            return ai.nodes
+        return run
+
+    def depth_search(self, position, player, config):
+        from minimax1 import OthelloAI
+        board = self.board(position)
+        return lambda: OthelloAI(max_depth=config['minimax1_depth'], max_time=float('inf')).get_move(board, player)
+
+
+class Minimax2Bench(EngineBench):
+    def game(self, position, player):
+        from minimax2 import OthelloGame
+        game = OthelloGame()
+        game.board = position.array.copy()
+        game.current_player = player
+        return game
+
+    def movegen(self, position, player):
+        game = self.game(position, player)
+        return game.get_valid_moves
+
+    def budget_search(self, position, player, config):
+        from minimax2 import MinimaxAI
+        game = self.game(position, player)
+        moves = game.get_valid_moves()
+
+        def run():
+            ai = MinimaxAI(config['minimax2_depth'], max_nodes=config['node_budget'])
+            ai.choose_move(moves, game)
+            return ai.nodes
+        return run
+
+    def depth_search(self, position, player, config):
+        from minimax2 import MinimaxAI
+        game = self.game(position, player)
+        moves = game.get_valid_moves()
+        return lambda: MinimaxAI(config['minimax2_depth']).choose_move(moves, game)
+
+
+class AStarBench(EngineBench):
+    def state(self, position):
+        from A_star import OthelloState
+        return OthelloState(position.signed.copy())
+
+    def movegen(self, position, player):
+        state = self.state(position)
+        side = signed_player(player)
+        return lambda: state.get_valid_moves(side)
+
+    def budget_search(self, position, player, config):
+        from A_star import OthelloAI
+        state = self.state(position)
+
+        def run():
+            ai = OthelloAI(signed_player(player), max_nodes=config['node_budget'])
+            ai.a_star_search(state, max_depth=64)
+            return ai.nodes
+        return run
+
+    def depth_search(self, position, player, config):
+        from A_star import OthelloAI
+        state = self.state(position)
+        return lambda: OthelloAI(signed_player(player)).a_star_search(state, max_depth=config['astar_depth'])
+
+
+class MonteCarloBench(EngineBench):
+    def bitboards(self, position, player):
+        return (position.black, position.white) if player == 1 else (position.white, position.black)
+
+    def movegen(self, position, player):
+        from monte_carlo import legal_moves
+        own, opp = self.bitboards(position, player)
+        return lambda: legal_moves(own, opp)
+
+    def budget_search(self, position, player, config):
+        from monte_carlo import MCTS
+        own, opp = self.bitboards(position, player)
+
+        def run():
+            ai = MCTS(max_playouts=config['playouts'], capacity=50000, seed=0)
+            ai.search(own, opp)
+            return ai.playouts
+        return run
+
+    def depth_search(self, position, player, config):
+        from monte_carlo import MCTS
+        own, opp = self.bitboards(position, player)
+        return lambda: MCTS(max_playouts=config['playouts'], capacity=50000, seed=0).search(own, opp)
+
+
+BENCHES = {
+    'minimax1': Minimax1Bench,
+    'minimax2': Minimax2Bench,
+    'astar': AStarBench,
+    'montecarlo': MonteCarloBench,
+}
+
+
+def _calls_for(fn: Callable[[], object], min_time: float) -> int:
+    """1回の計測が min_time 以上になる呼び出し回数"""
+    calls = 1
+    while True:
+        start = time.process_time()
+        for _ in range(calls):
+            fn()
+        elapsed = time.process_time() - start
+        if elapsed >= min_time:
+            return calls
+        calls *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+
+
+def time_per_call(fn: Callable[[], object], repeat: int, min_time: float) -> Tuple[float, float, object]:
+    """fn 1回あたりの CPU 時間（秒）、基準の計算1回の時間に対するその比、最後の戻り値
+
+    1回の計測が min_time 以上になる呼び出し回数で fn と基準の計算を交互に repeat 回ずつ測り、
+    時間と比はそれぞれの中央値を使う。CPU 時間で測るので、同じマシンで動いている他のプロセスの
+    影響を受けにくい。CPU の速さは数秒の単位で変わるので、比は同じ回に続けて測った時間から求める。
+    """
+    calls = _calls_for(fn, min_time)
+    reference_calls = _calls_for(reference_workload, min_time)
+    seconds, ratios = [], []
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(calls):
+            value = fn()
+        elapsed = (time.process_time() - start) / calls
+        start = time.process_time()
+        for _ in range(reference_calls):
+            reference_workload()
+        reference = (time.process_time() - start) / reference_calls
+        seconds.append(elapsed)
+        ratios.append(elapsed / reference)
+    return statistics.median(seconds), statistics.median(ratios), value
+
+
+def reference_workload() -> int:
+    """マシンの速さを測るための決まった計算（盤面の走査に近い整数演算とリストの参照）"""
+    cells = list(range(64))
+    total = 0
+    for i in range(2000):
+        total += cells[i & 63] * 3 + (i >> 2) & 255
+    return total
+
+
+def measure(engine: str, position: Position, player: int, config: dict, repeat: int,
+            min_time: float, search_min_time: float) -> dict:
+    """1回分の計測。探索は1回が数ミリ秒から数百ミリ秒かかるので、ばらつきを抑えるため
+    search_min_time（min_time より長い時間）を使う"""
+    bench = BENCHES[engine]()
+    # 同じマシンでも CPU の速さは時間とともに変わるので、比較には基準の計算の時間を単位にした値
+    # （relative）を使う。秒を単位にした値は表示用
+    result = {}
+    relative = {}
+    seconds, ratio, _ = time_per_call(bench.movegen(position, player), repeat, min_time)
+    result['movegen_per_sec'] = 1 / seconds
+    relative['movegen_per_sec'] = 1 / ratio
+    # ノード数で打ち切るので展開するノード数は毎回同じ
+    seconds, ratio, nodes = time_per_call(bench.budget_search(position, player, config), repeat, search_min_time)
+    result['nodes_per_sec'] = nodes / seconds
+    relative['nodes_per_sec'] = nodes / ratio
+    depth_search = bench.depth_search(position, player, config)
+    result['fixed_depth_sec'], relative['fixed_depth_sec'], _ = time_per_call(depth_search, repeat,
+                                                                             search_min_time)
+    # tracemalloc は実行を遅くするので時間の計測とは別に1回だけ実行する
+    tracemalloc.start()
+    depth_search()
+    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result['relative'] = relative
+    return result
+
+
+def normalized(metrics: dict) -> Dict[str, float]:
+    """比較に使う値（速度の指標は基準の計算の時間を単位にした値）"""
+    return dict(metrics['relative'], peak_memory=metrics['peak_memory'])
+
+
+def run_suite(engines: List[str], config: dict, repeat: int, min_time: float, search_min_time: float,
+              samples: int = 1, quiet: bool = False) -> dict:
+    """samples 回計測し、指標ごとの中央値と、補正した値の (最大 / 最小 - 1) をノイズの幅として返す"""
+    positions = load_positions()
+    results: Dict[str, Dict[str, dict]] = {}
+    noise: Dict[str, Dict[str, dict]] = {}
+    for engine in engines:
+        results[engine] = {}
+        noise[engine] = {}
+        for name, (position, player) in positions.items():
+            runs = []
+            for _ in range(samples):
+                runs.append(measure(engine, position, player, config, repeat, min_time, search_min_time))
+                if not quiet:
+                    print(f"{engine:10} {name:8} " + format_metrics(runs[-1]), file=sys.stderr)
+            median = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]
+                      if metric != 'relative'}
+            median['relative'] = {metric: statistics.median(run['relative'][metric] for run in runs)
+                                  for metric in runs[0]['relative']}
+            results[engine][name] = median
+            noise[engine][name] = {}
+            values = [normalized(run) for run in runs]
+            for metric in values[0]:
+                low = min(v[metric] for v in values)
+                high = max(v[metric] for v in values)
+                noise[engine][name][metric] = high / low - 1 if low else 0.0
+    return {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor()},
+        'config': config,
+        'samples': samples,
+        'results': results,
+        'noise': noise,
+    }
+
+
+def format_metrics(metrics: Dict[str, float]) -> str:
+    return (f"movegen {metrics['movegen_per_sec']:10.0f}/s  nodes {metrics['nodes_per_sec']:9.0f}/s  "
+            f"depth {metrics['fixed_depth_sec'] * 1000:9.1f}ms  memory {metrics['peak_memory'] / 1024:8.0f}KiB")
+
+
+def compare(baseline: dict, current: dict, threshold: float, memory_threshold: float) -> List[str]:
+    """基準値より (threshold + ノイズの幅) を超えて悪化した指標を列挙する
+
+    速度の指標は threshold、メモリは memory_threshold を使い、どちらにも基準値を記録したときに
+    測ったその指標のノイズの幅を足す。速度の指標は基準の計算の時間を単位にした値で比べる。
+    基準値にないエンジン・局面は比較しない。
+    """
+    regressions = []
+    for engine, positions in current['results'].items():
+        for name, metrics in positions.items():
+            base = baseline['results'].get(engine, {}).get(name)
+            if base is None:
+                continue
+            base_values = normalized(base)
+            noise = baseline.get('noise', {}).get(engine, {}).get(name, {})
+            for metric, value in normalized(metrics).items():
+                if not base_values.get(metric):
+                    continue
+                limit = (memory_threshold if metric == 'peak_memory' else threshold) + noise.get(metric, 0.0)
+                if metric in HIGHER_IS_BETTER:
+                    change = base_values[metric] / value - 1 if value else float('inf')
+                else:
+                    change = value / base_values[metric] - 1
+                if change > limit:
+                    regressions.append(f"{engine}/{name}/{metric}: {base[metric]:.6g} -> {metrics[metric]:.6g} "
+                                       f"({change * 100:+.1f}% worse relative to the reference workload, "
+                                       f"limit {limit * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エンジンの性能を固定局面で計測し、基準値と比べて回帰を検出する")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('record', 'compare'):
+        command = sub.add_parser(name)
+        command.add_argument('baseline', nargs='?', default='benchmark_baseline.json')
+        command.add_argument('--engines', nargs='+', choices=list(BENCHES), default=list(BENCHES))
+        command.add_argument('--repeat', type=int, default=7, help="各計測の繰り返し回数（中央値を使う）")
+        command.add_argument('--min-time', type=float, default=0.1, help="1回の計測に使う最低の CPU 時間（秒）")
+        command.add_argument('--search-min-time', type=float, default=0.2,
+                             help="探索の指標の1回の計測に使う最低の CPU 時間（秒）")
+    sub.choices['record'].add_argument('--samples', type=int, default=3,
+                                       help="計測の回数（中央値を基準値にし、ばらつきをノイズの幅とする）")
+    compare_parser = sub.choices['compare']
+    compare_parser.add_argument('--samples', type=int, default=1, help="計測の回数（中央値で比べる）")
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help="速度の指標がこの割合を超えて悪化したら回帰とする")
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.25,
+                                help="メモリの最大値がこの割合を超えて増えたら回帰とする")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        current = run_suite(args.engines, dict(DEFAULT_CONFIG), args.repeat, args.min_time,
+                            args.search_min_time, args.samples)
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=1)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['config'] != DEFAULT_CONFIG or 'noise' not in baseline:
+        print("baseline was recorded with different settings; record it again", file=sys.stderr)
+        sys.exit(2)
+    if baseline['machine']['platform'] != platform.platform():
+        print(f"warning: baseline was recorded on {baseline['machine']['platform']}", file=sys.stderr)
+    if baseline.get('samples', 1) < 2:
+        print("warning: baseline has no noise band; record it with --samples 2 or more", file=sys.stderr)
+    current = run_suite(args.engines, baseline['config'], args.repeat, args.min_time,
+                        args.search_min_time, args.samples)
+    regressions = compare(baseline, current, args.threshold, args.memory_threshold)
+    for line in regressions:
+        print("REGRESSION " + line)
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import importlib
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Union
+
+# エンジンのファクトリは time_limit（と任意のオプション）を受け取り、get_move(board, player) を持つオブジェクトを返す
+# "モジュール名:属性名" の文字列で登録すると、選択されたときに初めてインポートされる
+Factory = Union[str, Callable[[float], object]]
+
+
+@dataclass
+class EngineInfo:
+    name: str
+    factory: Factory
+    label: str
+    description: str = ""
+    # 同じ局面から常に同じ手を返すか（対局結果のキャッシュに使う）
+    # 時間切れで探索を打ち切ったアダプターは hit_time_limit を True にする
+    deterministic: bool = False
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def resolve(self) -> Callable[[float], object]:
+        if isinstance(self.factory, str):
+            module_name, attr = self.factory.split(':')
+            self.factory = getattr(importlib.import_module(module_name), attr)
+        return self.factory
+
+
+_REGISTRY: Dict[str, EngineInfo] = {}
+
+# 追加のエンジンを登録するモジュール（カンマ区切り）を指定する環境変数
+PLUGIN_ENV = "OTHELLO_ENGINE_PLUGINS"
+_plugins_loaded = False
+
+
+def register_engine(name: str, factory: Factory, label: str = None, description: str = "",
+                    deterministic: bool = False, **metadata) -> None:
+    """エンジンを名前で登録する"""
+    _REGISTRY[name] = EngineInfo(name, factory, label or name, description, deterministic, metadata)
+
+
+def load_plugins() -> None:
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for module_name in filter(None, os.environ.get(PLUGIN_ENV, "").split(',')):
+        importlib.import_module(module_name.strip())
+
+
+def available_engines() -> List[EngineInfo]:
+    load_plugins()
+    return list(_REGISTRY.values())
+
+
+def get_engine_info(name: str) -> EngineInfo:
+    """名前または表示名からエンジン情報を引く"""
+    load_plugins()
+    if name in _REGISTRY:
+        return _REGISTRY[name]
+    for info in _REGISTRY.values():
+        if info.label == name:
+            return info
+    raise KeyError(f"unknown engine: {name}")
+
+
+def create_engine(name: str, time_limit: float, **options) -> object:
+    return get_engine_info(name).resolve()(time_limit, **options)
+
+
+# 組み込みのエンジン
+register_engine("minimax1", "adapters:AI1Adapter", label="Minimax1",
+                description="位置の重み表と反復深化のアルファベータ探索", deterministic=True)
+register_engine("minimax2", "adapters:AI2Adapter", label="Minimax2",
+                description="石数差による深さ3のアルファベータ探索", deterministic=True)
+register_engine("astar", "adapters:AI4Adapter", label="A*探索",
+                description="評価値をヒューリスティックとするA*探索", deterministic=True)
+register_engine("montecarlo", "adapters:AI5Adapter", label="モンテカルロ",
+                description="モンテカルロ木探索（UCT、探索木を次の手に引き継ぐ）")
+register_engine("montecarlo-mp", "adapters:AI5ParallelAdapter", label="モンテカルロ（並列）",
+                description="ルート並列のモンテカルロ木探索（全コアのプロセスで探索して根の統計を合計）")
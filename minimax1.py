@@ -1,7 +1,10 @@
 import copy
+import json
 import time
 from typing import List, Tuple, Optional
 
+from stability import decided_winner, rows_to_bitboards, stable_counts
+
 class OthelloBoard:
     def __init__(self):
         self.EMPTY = 0
@@ -14,6 +17,10 @@ class OthelloBoard:
         self.board[3][4] = self.BLACK
         self.board[4][3] = self.BLACK
         self.board[4][4] = self.WHITE
+        # make_move の履歴（undo_move で巻き戻すため）
+        self.history = []
+        # 差分更新するパターン評価（pattern_eval.PatternEvaluator、未使用ならNone）
+        self.patterns = None
         
     def print_board(self):
         print("  0 1 2 3 4 5 6 7")
@@ -61,41 +68,141 @@ class OthelloBoard:
                     valid_moves.append((i, j))
         return valid_moves
 
-    def make_move(self, row: int, col: int, player: int) -> None:
-        if not self.is_valid_move(row, col, player):
-            return
-            
-        self.board[row][col] = player
+    def get_flips(self, row: int, col: int, player: int) -> List[Tuple[int, int]]:
+        # (row, col) に打ったときに裏返る石（打てない手なら空のリスト）
+        if row < 0 or row >= self.BOARD_SIZE or col < 0 or col >= self.BOARD_SIZE:
+            return []
+        if self.board[row][col] != self.EMPTY:
+            return []
+
         opponent = self.WHITE if player == self.BLACK else self.BLACK
         directions = [(0,1), (1,0), (0,-1), (-1,0), (1,1), (-1,-1), (1,-1), (-1,1)]
-        
+        flipped = []
+
         for dx, dy in directions:
             to_flip = []
             x, y = row + dx, col + dy
-            
+
             while 0 <= x < self.BOARD_SIZE and 0 <= y < self.BOARD_SIZE:
                 if self.board[x][y] == self.EMPTY:
                     break
                 if self.board[x][y] == opponent:
                     to_flip.append((x, y))
                 elif self.board[x][y] == player:
-                    for flip_x, flip_y in to_flip:
-                        self.board[flip_x][flip_y] = player
+                    flipped.extend(to_flip)
                     break
                 x, y = x + dx, y + dy
+        return flipped
+
+    def make_move(self, row: int, col: int, player: int) -> None:
+        flipped = self.get_flips(row, col, player)
+        if not flipped:
+            return
+
+        self.board[row][col] = player
+        for flip_x, flip_y in flipped:
+            self.board[flip_x][flip_y] = player
+
+        self.history.append((row, col, player, flipped))
+        if self.patterns is not None:
+            opponent = self.WHITE if player == self.BLACK else self.BLACK
+            self.patterns.place(row, col, player)
+            for flip_x, flip_y in flipped:
+                self.patterns.flip(flip_x, flip_y, opponent, player)
+
+    def undo_move(self) -> None:
+        # 直前の make_move を取り消す
+        row, col, player, flipped = self.history.pop()
+        opponent = self.WHITE if player == self.BLACK else self.BLACK
+        self.board[row][col] = self.EMPTY
+        for flip_x, flip_y in flipped:
+            self.board[flip_x][flip_y] = opponent
+        if self.patterns is not None:
+            self.patterns.remove(row, col, player)
+            for flip_x, flip_y in flipped:
+                self.patterns.flip(flip_x, flip_y, player, opponent)
 
     def get_score(self) -> Tuple[int, int]:
         black_count = sum(row.count(self.BLACK) for row in self.board)
         white_count = sum(row.count(self.WHITE) for row in self.board)
         return black_count, white_count
 
+def load_weight_table(path: str) -> Tuple[List[int], List[List[List[float]]]]:
+    """tune_weights.py が書き出した段階ごとの重み表を読み込む
+
+    戻り値は (段階の境界となる石数のリスト, 段階ごとの8x8の重み表)。
+    """
+    with open(path) as f:
+        table = json.load(f)
+    return table['phase_bounds'], table['weights']
+
+# 確定石で勝敗が決まった局面の評価値（どの評価関数の値よりも大きい）
+DECIDED_SCORE = 100000
+
+# ProbCut の既定パラメータ（probcut.py で探索ログから求めた値）
+# 深さ -> [(浅い探索の深さ, a, b, sigma), ...]
+# 深い探索の値を a * 浅い探索の値 + b で予測し、その誤差の標準偏差が sigma
+DEFAULT_PROBCUT = {
+    3: [(1, 1.066, 1.22, 29.5)],
+    4: [(2, 1.056, 2.14, 27.76)],
+    5: [(1, 1.123, 1.87, 41.14), (3, 1.055, 0.61, 25.77)],
+    6: [(2, 1.08, 2.95, 36.69), (4, 1.022, 0.75, 23.93)],
+}
+
+def load_probcut_params(path: str) -> dict:
+    """probcut.py が書き出したパラメータを読み込む"""
+    with open(path) as f:
+        return {int(depth): [tuple(pair) for pair in pairs] for depth, pairs in json.load(f).items()}
+
 class OthelloAI:
-    def __init__(self, max_depth: int = 5, max_time: float = 5.0):
+    def __init__(self, max_depth: int = 5, max_time: float = 5.0, eval_mode: str = "weights",
+                 weight_table: Optional[str] = None, probcut=None, probcut_threshold: float = 1.5,
+                 max_nodes: Optional[int] = None, tt=None, stability_weight: float = 0.0,
+                 stability_cutoff: bool = False):
         self.max_depth = max_depth
         self.max_time = max_time
+        # 反復深化を新しく始めない目安の時間（対局時計で使う。max_time は探索を中断する上限）
+        self.soft_time = None
+        # 探索ノード数の上限（指定すると時間制限の代わりに使い、結果が実行環境に依存しない）
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.out_of_budget = False
+        # 置換表（shared_tt.SharedTranspositionTable、複数プロセスで共有できる）
+        self.tt = tt
         self.start_time = 0
+        self.timed_out = False
+        # "weights": 位置の重み表, "pattern": 辺・隅・対角線のパターン評価
+        self.eval_mode = eval_mode
+        # 選択的探索（ProbCut）のパラメータ。True なら既定値、文字列ならファイルから読み込む
+        if probcut is True:
+            probcut = DEFAULT_PROBCUT
+        elif isinstance(probcut, str):
+            probcut = load_probcut_params(probcut)
+        self.probcut = probcut
+        self.probcut_threshold = probcut_threshold
+        self.root_depth = 0
+        # 最後に完了した反復深化の深さ
+        self.last_depth = 0
+        # 最後の探索の評価値と読み筋
+        self.last_score = None
+        self.last_pv = []
+        self.pv = {}
+        # 確定石の数の差に掛ける重み（0 なら確定石を数えない）
+        self.stability_weight = stability_weight
+        # 確定石が盤の半分を超えた局面は勝敗が決まっているので、それ以上読まない
+        self.stability_cutoff = stability_cutoff
+        # 調整済みの重み表（指定がなければ下の手書きの表を使う）
+        self.phase_weights = None
+        if weight_table is not None:
+            bounds, tables = load_weight_table(weight_table)
+            # 石数 -> その段階の重み表
+            self.phase_weights = [tables[next(p for p, b in enumerate(bounds) if n <= b)]
+                                  for n in range(65)]
         
     def evaluate_board(self, board: OthelloBoard, player: int) -> int:
+        if board.patterns is not None:
+            return board.patterns.evaluate(player) + self.stability_score(board, player)
+
         # 評価関数
         # コーナーの重み付けを高くする
         weights = [
@@ -108,6 +215,9 @@ class OthelloAI:
             [-20, -50, -2, -2, -2, -2, -50, -20],
             [100, -20, 10, 5, 5, 10, -20, 100]
         ]
+        if self.phase_weights is not None:
+            discs = 64 - sum(row.count(board.EMPTY) for row in board.board)
+            weights = self.phase_weights[discs]
         
         score = 0
         opponent = board.WHITE if player == board.BLACK else board.BLACK
@@ -119,67 +229,192 @@ class OthelloAI:
                 elif board.board[i][j] == opponent:
                     score -= weights[i][j]
                     
-        return score
+        return score + self.stability_score(board, player)
+
+    def stability_score(self, board: OthelloBoard, player: int) -> float:
+        """player から見た確定石の数の差に重みを掛けた値"""
+        if not self.stability_weight:
+            return 0
+        stable_black, stable_white = stable_counts(*rows_to_bitboards(board.board))
+        diff = stable_black - stable_white
+        return self.stability_weight * (diff if player == board.BLACK else -diff)
 
     def is_timeout(self) -> bool:
-        return time.time() - self.start_time > self.max_time
+        if self.max_nodes is not None:
+            if self.nodes >= self.max_nodes:
+                self.out_of_budget = True
+                return True
+            return False
+        if time.time() - self.start_time > self.max_time:
+            # 時間切れで探索を打ち切った（結果が実行環境に依存する）ことを記録
+            self.timed_out = True
+            return True
+        return False
 
     def minimax(self, board: OthelloBoard, depth: int, alpha: int, beta: int, 
                 maximizing_player: bool, player: int) -> Tuple[int, Optional[Tuple[int, int]]]:
+        self.nodes += 1
+        # 読み筋（ply 手目以降の最善手順）。子の探索が終わった直後に ply + 1 の読み筋を使う
+        ply = self.root_depth - depth
+        self.pv[ply] = []
         if depth == 0 or self.is_timeout():
             return self.evaluate_board(board, player), None
+        # 根では手を返す必要があるので行わない。深さ1では読む手間が判定の手間とあまり変わらないので省く
+        if self.stability_cutoff and 2 <= depth < self.root_depth:
+            winner = decided_winner(*rows_to_bitboards(board.board))
+            if winner:
+                return (DECIDED_SCORE if winner == player else -DECIDED_SCORE), None
             
-        valid_moves = board.get_valid_moves(player if maximizing_player else 
-                                          (board.WHITE if player == board.BLACK else board.BLACK))
-        
+        side = player if maximizing_player else (board.WHITE if player == board.BLACK else board.BLACK)
+        valid_moves = board.get_valid_moves(side)
+
         if not valid_moves:
             return self.evaluate_board(board, player), None
+
+        # 置換表: 十分な深さの結果があれば使い、なければ記録された最善手から調べる
+        tt_key = None
+        alpha_orig, beta_orig = alpha, beta
+        tt = self.tt
+        if tt is not None:
+            tt_key = tt.position_key(board.board, player if maximizing_player else 3 - player)
+            entry = tt.probe(tt_key)
+            if entry is not None:
+                tt_depth, bound, score, tt_move = entry
+                # 置換表の値は黒から見た値なので player から見た値に直す
+                if player != board.BLACK:
+                    score = -score
+                    bound = tt.flip_bound(bound)
+                if tt_move in valid_moves:
+                    valid_moves.remove(tt_move)
+                    valid_moves.insert(0, tt_move)
+                # 根では手を返す必要があるので、手が記録されているときだけ使う
+                if tt_depth >= depth and (tt_move is not None or depth < self.root_depth):
+                    if (bound == tt.EXACT or (bound == tt.LOWER and score >= beta)
+                            or (bound == tt.UPPER and score <= alpha)):
+                        if tt_move is not None:
+                            self.pv[ply] = [tt_move]
+                        return score, tt_move
+
+        # ProbCut: 浅い探索の結果から深い探索の値が窓の外になる見込みが高ければ打ち切る
+        # 根では手を返す必要があるので行わない
+        if self.probcut is not None and depth < self.root_depth:
+            for shallow_depth, a, b, sigma in self.probcut.get(depth, ()):
+                margin = self.probcut_threshold * sigma
+                if beta != float('inf'):
+                    bound = (beta + margin - b) / a
+                    value, _ = self.minimax(board, shallow_depth, bound - 1, bound, maximizing_player, player)
+                    if value >= bound:
+                        return beta, None
+                if alpha != float('-inf'):
+                    bound = (alpha - margin - b) / a
+                    value, _ = self.minimax(board, shallow_depth, bound, bound + 1, maximizing_player, player)
+                    if value <= bound:
+                        return alpha, None
             
         best_move = None
         if maximizing_player:
             max_eval = float('-inf')
             for move in valid_moves:
-                new_board = copy.deepcopy(board)
-                new_board.make_move(move[0], move[1], player)
-                eval_score, _ = self.minimax(new_board, depth-1, alpha, beta, False, player)
+                board.make_move(move[0], move[1], player)
+                eval_score, _ = self.minimax(board, depth-1, alpha, beta, False, player)
+                board.undo_move()
                 
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_move = move
+                    self.pv[ply] = [move] + self.pv.get(ply + 1, [])
                     
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
                     break
-            return max_eval, best_move
+            return self.tt_store(tt_key, depth, max_eval, alpha_orig, beta_orig, best_move,
+                                 player == board.BLACK)
         else:
             min_eval = float('inf')
             opponent = board.WHITE if player == board.BLACK else board.BLACK
             for move in valid_moves:
-                new_board = copy.deepcopy(board)
-                new_board.make_move(move[0], move[1], opponent)
-                eval_score, _ = self.minimax(new_board, depth-1, alpha, beta, True, player)
+                board.make_move(move[0], move[1], opponent)
+                eval_score, _ = self.minimax(board, depth-1, alpha, beta, True, player)
+                board.undo_move()
                 
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_move = move
+                    self.pv[ply] = [move] + self.pv.get(ply + 1, [])
                     
                 beta = min(beta, eval_score)
                 if beta <= alpha:
                     break
-            return min_eval, best_move
+            return self.tt_store(tt_key, depth, min_eval, alpha_orig, beta_orig, best_move,
+                                 player == board.BLACK)
+
+    def tt_store(self, tt_key, depth, value, alpha, beta, move, is_black):
+        # 時間切れや予算切れで打ち切った探索の値は不正確なので記録しない
+        if tt_key is not None and not (self.timed_out or self.out_of_budget):
+            tt = self.tt
+            if value <= alpha:
+                bound = tt.UPPER
+            elif value >= beta:
+                bound = tt.LOWER
+            else:
+                bound = tt.EXACT
+            # 置換表には黒から見た値で記録する
+            if is_black:
+                tt.store(tt_key, depth, bound, value, move)
+            else:
+                tt.store(tt_key, depth, tt.flip_bound(bound), -value, move)
+        return value, move
 
     def get_move(self, board: OthelloBoard, player: int) -> Optional[Tuple[int, int]]:
         self.start_time = time.time()
+        self.timed_out = False
+        self.out_of_budget = False
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_score = None
+        self.last_pv = []
         best_move = None
+        # 探索中は make_move / undo_move で盤面を書き換えるので作業用の複製を使う
+        board = copy.deepcopy(board)
+        board.history = []
+        if self.eval_mode == "pattern":
+            from pattern_eval import PatternEvaluator
+            board.patterns = PatternEvaluator(board.board)
         
+        if self.soft_time is not None:
+            # 持ち時間を配分しているときは、合法手が1つなら考えずに指す
+            valid_moves = board.get_valid_moves(player)
+            if len(valid_moves) == 1:
+                return valid_moves[0]
+
         # 反復深化
+        stable = 0
         for depth in range(1, self.max_depth + 1):
             if self.is_timeout():
                 break
-            _, move = self.minimax(board, depth, float('-inf'), float('inf'), True, player)
+            self.root_depth = depth
+            score, move = self.minimax(board, depth, float('-inf'), float('inf'), True, player)
+            if self.timed_out or self.out_of_budget:
+                # 打ち切った反復では調べ終えていない手があり、その最善手は前の反復の最善手より
+                # 悪いこともあるので使わない（minimax2 の choose_move と同じく最後に読み切った深さの手を返す）
+                break
             if move is not None:
+                stable = stable + 1 if move == best_move else 0
                 best_move = move
-                
+                self.last_score = score
+                self.last_pv = self.pv.get(0, [move])
+            self.last_depth = depth
+            if self.soft_time is not None:
+                # 次の深さはそれまでの合計以上に時間がかかるので、目安の6割を過ぎたら始めない
+                # 最善手が続けて変わらなければさらに半分で切り上げる
+                limit = self.soft_time * (0.3 if stable >= 2 else 0.6)
+                if time.time() - self.start_time >= limit:
+                    break
+
+        if best_move is None:
+            # 深さ1も読み切れなかったときは最初の合法手を指す
+            valid_moves = board.get_valid_moves(player)
+            best_move = valid_moves[0] if valid_moves else None
         return best_move
 
 def play_game():
@@ -1,10 +1,96 @@
 import numpy as np
 import random
+import time
+
+from stability import HALF_BOARD, stable_counts
 
 # Constants for the game
 EMPTY, BLACK, WHITE = 0, 1, 2
 DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
+# ビットボード用の定数（マス(x, y)をビット x*8+y に対応させる）
+FULL_MASK = (1 << 64) - 1
+NOT_COL0 = FULL_MASK & ~sum(1 << (x * 8) for x in range(8))
+NOT_COL7 = FULL_MASK & ~sum(1 << (x * 8 + 7) for x in range(8))
+# 各方向へのシフト量と、はみ出しを防ぐマスク
+SHIFTS = [(1, NOT_COL0), (-1, NOT_COL7), (8, FULL_MASK), (-8, FULL_MASK),
+          (9, NOT_COL0), (7, NOT_COL7), (-7, NOT_COL0), (-9, NOT_COL7)]
+
+# 石の符号（黒: +1, 白: -1）。盤面を添字に使って石数の差をまとめて求める
+DISC_SIGN = np.array([0, 1, -1])
+
+# mobility評価の重み（黒から見た値に掛ける）。stability は "stability" 評価のときだけ使う
+MOBILITY_WEIGHTS = {'disc': 1.0, 'mobility': 5.0, 'potential': 2.0, 'frontier': 3.0, 'stability': 10.0}
+
+# 勝敗が決まった局面の評価値の基準（黒から見た値）。どの評価関数の値よりも大きく、
+# 終局は ±DECIDED_SCORE に石数の差を、確定石で決まった局面は石数の差の下限を足した値にするので、
+# 実際の勝ち負けが評価値より常に優先される
+DECIDED_SCORE = 10000
+
+def shift(bits, amount, mask):
+    if amount > 0:
+        return (bits << amount) & mask
+    return (bits >> -amount) & mask
+
+def to_bitboards(board):
+    """盤面を (黒, 白) のビットボードに変換する"""
+    black = int.from_bytes(np.packbits(board == BLACK, bitorder='little').tobytes(), 'little')
+    white = int.from_bytes(np.packbits(board == WHITE, bitorder='little').tobytes(), 'little')
+    return black, white
+
+def moves_bitboard(own, opp):
+    """ownの合法手をビットボードでまとめて求める"""
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    # 終局の判定で葉ごとに呼ぶので、shift を使わずに方向ごとのシフトを展開する
+    for amount, mask in SHIFTS:
+        inner = mask & opp
+        if amount > 0:
+            line = (own << amount) & inner
+            for _ in range(5):
+                line |= (line << amount) & inner
+            moves |= (line << amount) & mask & empty
+        else:
+            amount = -amount
+            line = (own >> amount) & inner
+            for _ in range(5):
+                line |= (line >> amount) & inner
+            moves |= (line >> amount) & mask & empty
+    return moves
+
+def is_terminal(board):
+    """どちらにも合法手がない（終局した）か"""
+    black, white = to_bitboards(board)
+    return not moves_bitboard(black, white) and not moves_bitboard(white, black)
+
+def final_score(board):
+    """終局した盤面の評価値（黒から見た値）"""
+    diff = int(np.sum(board == BLACK) - np.sum(board == WHITE))
+    if diff == 0:
+        return 0
+    return (DECIDED_SCORE if diff > 0 else -DECIDED_SCORE) + diff
+
+def decided_score(black, white):
+    """確定石で勝敗が決まっていれば final_score と同じ尺度の評価値（黒から見た値）、決まっていなければ None"""
+    # 石が半分を超えていなければ確定石も超えないので計算しない
+    if black.bit_count() <= HALF_BOARD and white.bit_count() <= HALF_BOARD:
+        return None
+    stable_black, stable_white = stable_counts(black, white)
+    # 勝つ側の石は確定石より減らず、負ける側の石は残りのマスより増えないので、
+    # 終局の石数の差は 2 * 確定石 - 64 以上になる。その下限を足して実際の終局の値を超えないようにする
+    if stable_black > HALF_BOARD:
+        return DECIDED_SCORE + 2 * stable_black - 64
+    if stable_white > HALF_BOARD:
+        return -DECIDED_SCORE - (2 * stable_white - 64)
+    return None
+
+def neighbours(bits):
+    """bitsのいずれかに隣接するマスの集合"""
+    result = 0
+    for amount, mask in SHIFTS:
+        result |= shift(bits, amount, mask)
+    return result
+
 class OthelloGame:
     def __init__(self):
         self.board = np.zeros((8, 8), dtype=int)  # 8x8のボードを作成（0: EMPTY）
@@ -78,10 +164,85 @@ class OthelloGame:
         print()
 
 class MinimaxAI:
-    def __init__(self, depth):
+    def __init__(self, depth, eval_mode="disc", max_nodes=None, tt=None, batch_leaves=False,
+                 stability_cutoff=False):
         self.depth = depth
+        # 確定石が盤の半分を超えた局面は勝敗が決まっているので、それ以上読まない
+        self.stability_cutoff = stability_cutoff
+        # 深さ1のノードで子の盤面を積み重ねて一度に評価する（"disc" 評価のときのみ）
+        self.batch_leaves = batch_leaves
+        # 置換表（shared_tt.SharedTranspositionTable、複数プロセスで共有できる）
+        self.tt = tt
+        # 探索ノード数の上限。指定すると深さ1から順に上限に達するまで深くし、
+        # 最後に読み切った深さの手を返す（結果が実行環境に依存しない）
+        self.max_nodes = max_nodes
+        # 思考時間（秒）。max_time を指定すると同じく深さ1から順に深くし、max_time で探索を中断する。
+        # soft_time を過ぎたら次の深さを始めない（対局時計で adapters.AI2Adapter が設定する）
+        self.max_time = None
+        self.soft_time = None
+        self.deadline = None
+        self.nodes = 0
+        self.out_of_budget = False
+        self.last_depth = 0
+        # 最後に選んだ手の評価値（黒から見た値）
+        self.last_score = None
+        # "disc": 石数の差, "mobility": 着手可能数・潜在的着手可能数・辺縁石を加えた評価
+        # "stability": mobility に確定石の数の差を加えた評価
+        self.eval_mode = eval_mode
+
+    def evaluate(self, board):
+        """黒から見た評価値"""
+        if self.eval_mode == "disc":
+            return np.sum(board == BLACK) - np.sum(board == WHITE)
+        black, white = to_bitboards(board)
+        empty = ~(black | white) & FULL_MASK
+        disc = black.bit_count() - white.bit_count()
+        mobility = moves_bitboard(black, white).bit_count() - moves_bitboard(white, black).bit_count()
+        # 潜在的着手可能数: 相手の石に隣接する空きマスの数
+        potential = (neighbours(white) & empty).bit_count() - (neighbours(black) & empty).bit_count()
+        # 辺縁石: 空きマスに隣接する自分の石（少ない方が良い）
+        empty_adjacent = neighbours(empty)
+        frontier = (black & empty_adjacent).bit_count() - (white & empty_adjacent).bit_count()
+        w = MOBILITY_WEIGHTS
+        value = (w['disc'] * disc + w['mobility'] * mobility
+                 + w['potential'] * potential - w['frontier'] * frontier)
+        if self.eval_mode == "stability":
+            stable_black, stable_white = stable_counts(black, white)
+            value += w['stability'] * (stable_black - stable_white)
+        return value
 
     def choose_move(self, valid_moves, game):
+        self.nodes = 0
+        self.out_of_budget = False
+        self.deadline = None
+        if self.max_nodes is None and self.max_time is None:
+            self.last_depth = self.depth
+            move, self.last_score = self.search_root(valid_moves, game, self.depth)
+            return move
+
+        start = time.perf_counter()
+        if self.max_time is not None:
+            self.deadline = start + self.max_time
+        best_move = valid_moves[0] if valid_moves else None
+        self.last_depth = 0
+        self.last_score = None
+        for depth in range(1, 61):
+            move, score = self.search_root(valid_moves, game, depth)
+            if self.out_of_budget:
+                break
+            best_move = move
+            self.last_score = score
+            self.last_depth = depth
+            if self.soft_time is not None and time.perf_counter() - start >= self.soft_time:
+                break
+        return best_move
+
+    def budget_exhausted(self):
+        """ノード数か時間の上限に達したか"""
+        return ((self.max_nodes is not None and self.nodes > self.max_nodes)
+                or (self.deadline is not None and time.perf_counter() > self.deadline))
+
+    def search_root(self, valid_moves, game, depth):
         best_move = None
         best_score = float('-inf') if game.current_player == BLACK else float('inf')
 
@@ -90,8 +251,9 @@ class MinimaxAI:
             temp_game.board = game.board.copy()
             temp_game.current_player = game.current_player
             temp_game.make_move(*move)
+            temp_game.switch_player()
 
-            score = self.minimax(temp_game, self.depth - 1, float('-inf'), float('inf'), False if game.current_player == BLACK else True)
+            score = self.minimax(temp_game, depth - 1, float('-inf'), float('inf'), False if game.current_player == BLACK else True)
 
             if game.current_player == BLACK and score > best_score:
                 best_score = score
@@ -100,11 +262,24 @@ class MinimaxAI:
                 best_score = score
                 best_move = move
 
-        return best_move
+        return best_move, best_score
 
     def minimax(self, game, depth, alpha, beta, is_maximizing):
-        if depth == 0 or game.is_game_over():
-            return np.sum(game.board == BLACK) - np.sum(game.board == WHITE)
+        self.nodes += 1
+        if self.budget_exhausted():
+            # 上限に達したらこの反復は打ち切る（choose_move で結果を捨てる）
+            self.out_of_budget = True
+            return self.evaluate(game.board)
+        if is_terminal(game.board):
+            # 終局は石数の差で確定させる（深さ0の葉でも評価関数は使わない）
+            return final_score(game.board)
+        if depth == 0:
+            return self.evaluate(game.board)
+        # 深さ1では読む手間が判定の手間とあまり変わらないので省く
+        if self.stability_cutoff and depth >= 2:
+            score = decided_score(*to_bitboards(game.board))
+            if score is not None:
+                return score
 
         valid_moves = game.get_valid_moves()
         if not valid_moves:
@@ -114,6 +289,26 @@ class MinimaxAI:
             temp_game.switch_player()
             return self.minimax(temp_game, depth, alpha, beta, not is_maximizing)
 
+        # 置換表（値は黒から見た値なのでそのまま使える）
+        tt = self.tt
+        tt_key = None
+        alpha_orig, beta_orig = alpha, beta
+        if tt is not None:
+            tt_key = tt.position_key(game.board, game.current_player)
+            entry = tt.probe(tt_key)
+            if entry is not None:
+                tt_depth, bound, score, tt_move = entry
+                if tt_move in valid_moves:
+                    valid_moves.remove(tt_move)
+                    valid_moves.insert(0, tt_move)
+                if tt_depth >= depth and (bound == tt.EXACT or (bound == tt.LOWER and score >= beta)
+                                          or (bound == tt.UPPER and score <= alpha)):
+                    return score
+
+        if depth == 1 and self.batch_leaves and self.eval_mode == "disc":
+            return self.evaluate_children(game, valid_moves, is_maximizing, tt_key, alpha_orig, beta_orig)
+
+        best_move = None
         if is_maximizing:
             max_eval = float('-inf')
             for move in valid_moves:
@@ -121,12 +316,15 @@ class MinimaxAI:
                 temp_game.board = game.board.copy()
                 temp_game.current_player = game.current_player
                 temp_game.make_move(*move)
+                temp_game.switch_player()
                 eval = self.minimax(temp_game, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
+                if eval > max_eval:
+                    max_eval = eval
+                    best_move = move
                 alpha = max(alpha, eval)
                 if beta <= alpha:
                     break
-            return max_eval
+            return self.tt_store(tt_key, depth, max_eval, alpha_orig, beta_orig, best_move)
         else:
             min_eval = float('inf')
             for move in valid_moves:
@@ -134,12 +332,53 @@ class MinimaxAI:
                 temp_game.board = game.board.copy()
                 temp_game.current_player = game.current_player
                 temp_game.make_move(*move)
+                temp_game.switch_player()
                 eval = self.minimax(temp_game, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval)
+                if eval < min_eval:
+                    min_eval = eval
+                    best_move = move
                 beta = min(beta, eval)
                 if beta <= alpha:
                     break
-            return min_eval
+            return self.tt_store(tt_key, depth, min_eval, alpha_orig, beta_orig, best_move)
+
+    def evaluate_children(self, game, valid_moves, is_maximizing, tt_key, alpha, beta):
+        """子の盤面を (手の数, 8, 8) の配列に並べ、石数の差を一度に計算する"""
+        boards = np.empty((len(valid_moves), 8, 8), dtype=game.board.dtype)
+        temp_game = OthelloGame()
+        temp_game.current_player = game.current_player
+        for i, move in enumerate(valid_moves):
+            boards[i] = game.board
+            # boards[i] はビューなので make_move がそのまま配列に書き込む。子は盤面だけで評価するので
+            # 手番は親のまま（同じ temp_game で続けて打つ）
+            temp_game.board = boards[i]
+            temp_game.make_move(*move)
+        self.nodes += len(valid_moves)
+        if self.budget_exhausted():
+            self.out_of_budget = True
+
+        scores = DISC_SIGN[boards].sum(axis=(1, 2)).tolist()
+        # 終局した子は他の葉と同じく final_score で評価する（ビットボードは全ての子の分をまとめて作る）
+        flat = boards.reshape(len(valid_moves), 64)
+        blacks = np.packbits(flat == BLACK, axis=1, bitorder='little').view('<u8').ravel().tolist()
+        whites = np.packbits(flat == WHITE, axis=1, bitorder='little').view('<u8').ravel().tolist()
+        for i, (black, white) in enumerate(zip(blacks, whites)):
+            if not moves_bitboard(white, black) and not moves_bitboard(black, white):
+                scores[i] = final_score(boards[i])
+        index = scores.index(max(scores) if is_maximizing else min(scores))
+        return self.tt_store(tt_key, 1, scores[index], alpha, beta, valid_moves[index])
+
+    def tt_store(self, tt_key, depth, value, alpha, beta, move):
+        # 予算切れで打ち切った探索の値は不正確なので記録しない
+        if tt_key is not None and not self.out_of_budget:
+            if value <= alpha:
+                bound = self.tt.UPPER
+            elif value >= beta:
+                bound = self.tt.LOWER
+            else:
+                bound = self.tt.EXACT
+            self.tt.store(tt_key, depth, bound, float(value), move)
+        return value
 
 class RandomAI:
     def choose_move(self, valid_moves, game):
@@ -160,6 +399,27 @@ class GreedyAI:
                 best_move = move
         return best_move
 
+def measure_evaluation_cost(eval_mode, positions=200, repeat=50):
+    """ランダムな局面で評価関数1回あたりの時間（秒）を計測する"""
+    boards = []
+    game = OthelloGame()
+    while len(boards) < positions:
+        valid_moves = game.get_valid_moves()
+        if not valid_moves:
+            game.switch_player()
+            if not game.get_valid_moves():
+                game = OthelloGame()
+            continue
+        game.make_move(*random.choice(valid_moves))
+        game.switch_player()
+        boards.append(game.board.copy())
+    ai = MinimaxAI(1, eval_mode)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            ai.evaluate(board)
+    return (time.perf_counter() - start) / (positions * repeat)
+
 def play_game(black_ai, white_ai):
     game = OthelloGame()
     while not game.is_game_over():
@@ -1,7 +1,11 @@
-import tkinter as tk
-from tkinter import messagebox
 import copy
+import math
+import os
 import random
+import time
+import weakref
+from array import array
+from typing import List, Optional, Tuple
 
 class Othello:
     def __init__(self):
@@ -69,11 +73,498 @@ class Othello:
         else:
             return 0  # 引き分け
 
+# モンテカルロ木探索（UCT）
+# 盤面は (手番側の石, 相手の石) のビットボード（マス (x, y) がビット x*8+y）で扱い、
+# 探索木は NodePool の固定長配列に持つ。色の番号には依存しない。
+FULL_MASK = (1 << 64) - 1
+NOT_COL0 = FULL_MASK & ~sum(1 << (x * 8) for x in range(8))
+NOT_COL7 = FULL_MASK & ~sum(1 << (x * 8 + 7) for x in range(8))
+# 各方向へのシフト量と、はみ出しを防ぐマスク
+SHIFTS = [(1, NOT_COL0), (-1, NOT_COL7), (8, FULL_MASK), (-8, FULL_MASK),
+          (9, NOT_COL0), (7, NOT_COL7), (-7, NOT_COL0), (-9, NOT_COL7)]
+PASS = 64
+
+
+def to_bitboards(board, player: int) -> Tuple[int, int]:
+    """リストのリストの盤面を (player の石, 相手の石) にする"""
+    own = opp = 0
+    for x in range(8):
+        for y in range(8):
+            if board[x][y] == player:
+                own |= 1 << (x * 8 + y)
+            elif board[x][y] == 3 - player:
+                opp |= 1 << (x * 8 + y)
+    return own, opp
+
+
+def legal_moves(own: int, opp: int) -> int:
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    for amount, mask in SHIFTS:
+        if amount > 0:
+            line = (own << amount) & mask & opp
+            for _ in range(5):
+                line |= (line << amount) & mask & opp
+            moves |= (line << amount) & mask & empty
+        else:
+            line = (own >> -amount) & mask & opp
+            for _ in range(5):
+                line |= (line >> -amount) & mask & opp
+            moves |= (line >> -amount) & mask & empty
+    return moves
+
+
+def flips(own: int, opp: int, square: int) -> int:
+    """square に打ったときに返る石"""
+    flipped = 0
+    for amount, mask in SHIFTS:
+        line = 0
+        if amount > 0:
+            x = ((1 << square) << amount) & mask
+            while x & opp:
+                line |= x
+                x = (x << amount) & mask
+        else:
+            x = ((1 << square) >> -amount) & mask
+            while x & opp:
+                line |= x
+                x = (x >> -amount) & mask
+        if x & own:
+            flipped |= line
+    return flipped
+
+
+def play(own: int, opp: int, square: int) -> Tuple[int, int]:
+    """square に打ち、手番を交代した (手番側, 相手) を返す（PASS なら交代だけ）"""
+    if square == PASS:
+        return opp, own
+    flipped = flips(own, opp, square)
+    return opp & ~flipped, own | flipped | (1 << square)
+
+
+def random_playout(own: int, opp: int, rng: random.Random) -> float:
+    """終局まで無作為に打ち、開始時の手番側から見た結果（勝ち 1, 引き分け 0.5, 負け 0）を返す"""
+    sign = 1
+    while True:
+        moves = legal_moves(own, opp)
+        if not moves:
+            if not legal_moves(opp, own):
+                break
+            own, opp = opp, own
+            sign = -sign
+            continue
+        for _ in range(rng.randrange(moves.bit_count())):
+            moves &= moves - 1
+        square = (moves & -moves).bit_length() - 1
+        own, opp = play(own, opp, square)
+        sign = -sign
+    diff = (own.bit_count() - opp.bit_count()) * sign
+    return 1.0 if diff > 0 else (0.5 if diff == 0 else 0.0)
+
+
+class NodePool:
+    """探索木のノードを固定長の配列に持つ
+
+    1つのノードの子はまとめて連続した区間（ブロック）に確保し、親は先頭位置と個数だけを持つ。
+    解放したブロックは大きさごとの空きリストに戻して再利用し、足りなければ大きなブロックを分割する。
+    count は -1 なら未展開、0 なら終局、正なら子の数。
+    value はそのノードへの手を打った側から見た結果の合計。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.visits = array('I', bytes(4 * capacity))
+        self.value = array('d', bytes(8 * capacity))
+        self.first = array('i', bytes(4 * capacity))
+        self.count = array('b', bytes(capacity))
+        self.move = array('b', bytes(capacity))
+        self.free_blocks = {}
+        self.top = 0
+        self.used = 0
+        self.peak = 0
+        # 満杯で展開できなかった回数と、断片化した空きを詰め直した回数
+        self.exhausted = 0
+        self.compactions = 0
+
+    def allocate(self, size: int) -> int:
+        """size 個の連続したノードを確保して先頭を返す（空きがなければ -1）"""
+        blocks = self.free_blocks.get(size)
+        if blocks:
+            start = blocks.pop()
+        elif self.top + size <= self.capacity:
+            start = self.top
+            self.top += size
+        else:
+            # 末尾に空きがなければ、より大きな空きブロックを分割して使う
+            larger = [n for n, blocks in self.free_blocks.items() if n > size and blocks]
+            if not larger:
+                self.exhausted += 1
+                return -1
+            block_size = min(larger)
+            start = self.free_blocks[block_size].pop()
+            self.free_blocks.setdefault(block_size - size, []).append(start + size)
+        for node in range(start, start + size):
+            self.visits[node] = 0
+            self.value[node] = 0.0
+            self.count[node] = -1
+        self.used += size
+        self.peak = max(self.peak, self.used)
+        return start
+
+    def compact(self, root: int) -> int:
+        """根から届くブロックを先頭から詰め直し、新しい根の位置を返す
+
+        ブロックはアドレス順に前へずらすだけなので、移動先がまだ移していないブロックを
+        上書きすることはない。探索の途中（ノード番号を保持している間）には呼ばない。
+        """
+        blocks = [(root, 1)]
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if self.count[node] > 0:
+                first, count = self.first[node], self.count[node]
+                blocks.append((first, count))
+                stack.extend(range(first, first + count))
+        blocks.sort()
+        new_start = {}
+        top = 0
+        for start, size in blocks:
+            new_start[start] = top
+            top += size
+        for start, size in blocks:
+            for node in range(start, start + size):
+                if self.count[node] > 0:
+                    self.first[node] = new_start[self.first[node]]
+        for start, size in blocks:
+            dest = new_start[start]
+            if dest != start:
+                for field in (self.visits, self.value, self.first, self.count, self.move):
+                    field[dest:dest + size] = field[start:start + size]
+        self.top = self.used = top
+        self.free_blocks = {}
+        self.compactions += 1
+        return new_start[root]
+
+    def release(self, start: int, size: int) -> None:
+        self.free_blocks.setdefault(size, []).append(start)
+        self.used -= size
+
+    def release_subtree(self, node: int, keep: int = -1) -> int:
+        """node の子孫のブロックを解放する（keep の部分木は残す）。解放したノード数を返す"""
+        released = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node == keep or self.count[node] <= 0:
+                continue
+            first, count = self.first[node], self.count[node]
+            stack.extend(range(first, first + count))
+            self.release(first, count)
+            released += count
+        return released
+
+
+class MCTS:
+    """UCT によるモンテカルロ木探索
+
+    time_limit 秒、または max_playouts 回のプレイアウトで打ち切る。
+    打った手の後の局面が前回の木にあれば、その部分木を残して次の探索に使う。
+    ノード数は capacity で上限を決め、満杯になったら木を広げずにプレイアウトだけを続ける。
+    """
+
+    def __init__(self, time_limit: float = 1.0, max_playouts: Optional[int] = None,
+                 capacity: int = 500000, exploration: float = 1.4, seed: Optional[int] = None):
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.pool = NodePool(capacity)
+        self.root = -1
+        self.root_position = None
+        self.playouts = 0
+        self.elapsed = 0.0
+        self.reused = 0
+        self.reclaimed = 0
+        # 空きが断片化して展開できなかったので、次の反復の前に詰め直す
+        self.compact_pending = False
+
+    def get_move(self, board, player: int) -> Optional[Tuple[int, int]]:
+        own, opp = to_bitboards(board, player)
+        return self.search(own, opp)
+
+    def search(self, own: int, opp: int) -> Optional[Tuple[int, int]]:
+        """手番側の石 own、相手の石 opp の局面で最善手を返す"""
+        if not legal_moves(own, opp):
+            return None
+        start_time = time.time()
+        self.set_root(own, opp)
+        pool = self.pool
+        self.playouts = 0
+        while True:
+            if self.max_playouts is not None:
+                if self.playouts >= self.max_playouts:
+                    break
+            elif self.playouts % 16 == 0 and time.time() - start_time > self.time_limit:
+                break
+            if self.compact_pending:
+                self.root = pool.compact(self.root)
+                self.compact_pending = False
+            self.iterate(own, opp)
+            self.playouts += 1
+        self.elapsed = time.time() - start_time
+
+        first, count = pool.first[self.root], pool.count[self.root]
+        if count <= 0:
+            # ノードが足りず根を展開できなかった
+            moves = legal_moves(own, opp)
+            return divmod((moves & -moves).bit_length() - 1, 8)
+        # 訪問回数が最も多い手を選ぶ
+        best = max(range(first, first + count), key=lambda child: pool.visits[child])
+        return divmod(pool.move[best], 8)
+
+    def set_root(self, own: int, opp: int) -> None:
+        """前回の木から現在の局面を探して根にする（自分の手と相手の手、パスを含め3手先まで）"""
+        pool = self.pool
+        found = -1
+        if self.root != -1:
+            stack = [(self.root, self.root_position[0], self.root_position[1], 0)]
+            while stack and found == -1:
+                node, node_own, node_opp, depth = stack.pop()
+                if depth > 0 and (node_own, node_opp) == (own, opp):
+                    found = node
+                    break
+                if depth < 3 and pool.count[node] > 0:
+                    for child in range(pool.first[node], pool.first[node] + pool.count[node]):
+                        stack.append((child, *play(node_own, node_opp, pool.move[child]), depth + 1))
+
+        if found == -1:
+            if self.root != -1:
+                self.reclaimed = pool.release_subtree(self.root)
+                pool.release(self.root, 1)
+            self.reused = 0
+            self.root = pool.allocate(1)
+        else:
+            # 残す部分木の根を大きさ1のブロックに移し、それ以外を解放する
+            fields = (pool.visits, pool.value, pool.first, pool.count, pool.move)
+            saved = [field[found] for field in fields]
+            self.reclaimed = pool.release_subtree(self.root, keep=found) + 1
+            pool.release(self.root, 1)
+            root = pool.allocate(1)
+            for field, value in zip(fields, saved):
+                field[root] = value
+            self.root = root
+            self.reused = pool.visits[root]
+        self.root_position = (own, opp)
+
+    def expand(self, node: int, own: int, opp: int) -> None:
+        pool = self.pool
+        moves = legal_moves(own, opp)
+        if moves:
+            squares = []
+            while moves:
+                low = moves & -moves
+                squares.append(low.bit_length() - 1)
+                moves ^= low
+        elif legal_moves(opp, own):
+            squares = [PASS]
+        else:
+            pool.count[node] = 0
+            return
+        first = pool.allocate(len(squares))
+        if first == -1:
+            # 使用量に余裕があるのに確保できなければ断片化しているので詰め直す
+            # （詰め直しても空きがない状態を繰り返さないよう9割未満のときだけ）
+            if pool.used < pool.capacity * 0.9:
+                self.compact_pending = True
+            return
+        for i, square in enumerate(squares):
+            pool.move[first + i] = square
+        pool.first[node] = first
+        pool.count[node] = len(squares)
+
+    def select_child(self, node: int) -> int:
+        pool = self.pool
+        visits, value = pool.visits, pool.value
+        log_total = math.log(visits[node])
+        best, best_score = -1, -1.0
+        first = pool.first[node]
+        for child in range(first, first + pool.count[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            score = value[child] / n + self.exploration * math.sqrt(log_total / n)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def iterate(self, own: int, opp: int) -> None:
+        pool = self.pool
+        count = pool.count
+        node = self.root
+        path = [node]
+        # 選択: 展開済みのノードを UCB でたどる
+        while count[node] > 0:
+            node = self.select_child(node)
+            own, opp = play(own, opp, pool.move[node])
+            path.append(node)
+        # 展開: 2回目に訪れた葉（根は最初から）の子を作り、そのうち1つからプレイアウトする
+        if count[node] == -1 and (pool.visits[node] > 0 or node == self.root):
+            self.expand(node, own, opp)
+            if count[node] > 0:
+                node = pool.first[node]
+                own, opp = play(own, opp, pool.move[node])
+                path.append(node)
+        # シミュレーション: 葉の手番側から見た結果
+        result = random_playout(own, opp, self.rng)
+        # 逆伝播: 各ノードの値はそのノードへの手を打った側（葉の手番の相手から交互）から見た値
+        reward = 1.0 - result
+        for node in reversed(path):
+            pool.visits[node] += 1
+            pool.value[node] += reward
+            reward = 1.0 - reward
+
+    def root_statistics(self) -> dict:
+        """根の各手の (訪問回数, 手番側から見た結果の合計)"""
+        pool = self.pool
+        if self.root == -1 or pool.count[self.root] <= 0:
+            return {}
+        first = pool.first[self.root]
+        return {pool.move[child]: (pool.visits[child], pool.value[child])
+                for child in range(first, first + pool.count[self.root])}
+
+    def stats(self) -> dict:
+        pool = self.pool
+        return {
+            'capacity': pool.capacity, 'used': pool.used, 'peak': pool.peak,
+            'free_blocks': sum(len(blocks) for blocks in pool.free_blocks.values()),
+            'exhausted': pool.exhausted, 'compactions': pool.compactions, 'reused_visits': self.reused, 'reclaimed': self.reclaimed,
+            'playouts': self.playouts,
+            'playouts_per_second': self.playouts / self.elapsed if self.elapsed else 0.0,
+        }
+
+
+def _root_worker(conn, capacity: int, seed: Optional[int]) -> None:
+    """ParallelMCTS のワーカー。自分の木を持ち続け、局面を受け取るたびに探索して根の統計を返す"""
+    ai = MCTS(capacity=capacity, seed=seed)
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        own, opp, time_limit, max_playouts = request
+        ai.time_limit = time_limit
+        ai.max_playouts = max_playouts
+        ai.search(own, opp)
+        conn.send((ai.root_statistics(), ai.playouts))
+    conn.close()
+
+
+def _shutdown_workers(connections, processes) -> None:
+    for conn in connections:
+        try:
+            conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=1.0)
+        if process.is_alive():
+            process.terminate()
+
+
+class ParallelMCTS:
+    """ルート並列のモンテカルロ木探索
+
+    ワーカープロセスごとに独立した MCTS（別々の乱数）で同じ局面を探索し、
+    根の手ごとの訪問回数と結果を合計して手を選ぶ。各ワーカーは決まったプロセスで
+    動き続けるので、自分の木を次の手に引き継げる。
+    max_playouts はワーカー全体の合計で、ワーカー数で等分する。
+    """
+
+    def __init__(self, time_limit: float = 1.0, max_playouts: Optional[int] = None,
+                 workers: Optional[int] = None, capacity: int = 500000, seed: Optional[int] = None):
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = capacity
+        self.seed = seed
+        self.connections = []
+        self.processes = []
+        self.playouts = 0
+        self.elapsed = 0.0
+        self.worker_playouts: List[int] = []
+
+    def start(self) -> None:
+        # 並列探索を使うときだけ読み込む（単一プロセスの MCTS の読み込みを軽くする）
+        import multiprocessing
+        for i in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            seed = None if self.seed is None else self.seed * 1000 + i
+            process = multiprocessing.Process(target=_root_worker, args=(child, self.capacity, seed), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        # 参照がなくなったらワーカーを止める（close を呼び忘れても残らない）
+        self._finalizer = weakref.finalize(self, _shutdown_workers, self.connections, self.processes)
+
+    def close(self) -> None:
+        if self.processes:
+            self._finalizer()
+            self.connections, self.processes = [], []
+
+    def get_move(self, board, player: int) -> Optional[Tuple[int, int]]:
+        own, opp = to_bitboards(board, player)
+        return self.search(own, opp)
+
+    def search(self, own: int, opp: int) -> Optional[Tuple[int, int]]:
+        if not legal_moves(own, opp):
+            return None
+        if not self.processes:
+            self.start()
+        start_time = time.time()
+        if self.max_playouts is None:
+            budgets = [None] * self.workers
+        else:
+            budgets = [self.max_playouts // self.workers + (i < self.max_playouts % self.workers)
+                       for i in range(self.workers)]
+        for conn, budget in zip(self.connections, budgets):
+            conn.send((own, opp, self.time_limit, budget))
+
+        visits: dict = {}
+        values: dict = {}
+        self.worker_playouts = []
+        for conn in self.connections:
+            statistics, playouts = conn.recv()
+            self.worker_playouts.append(playouts)
+            for square, (n, value) in statistics.items():
+                visits[square] = visits.get(square, 0) + n
+                values[square] = values.get(square, 0.0) + value
+        self.playouts = sum(self.worker_playouts)
+        self.elapsed = time.time() - start_time
+
+        if not visits:
+            moves = legal_moves(own, opp)
+            return divmod((moves & -moves).bit_length() - 1, 8)
+        # 訪問回数の合計が最も多い手（同数なら勝率の高い手）
+        best = max(visits, key=lambda square: (visits[square], values[square] / max(visits[square], 1)))
+        return divmod(best, 8)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers, 'playouts': self.playouts, 'worker_playouts': self.worker_playouts,
+            'playouts_per_second': self.playouts / self.elapsed if self.elapsed else 0.0,
+        }
+
+
 class OthelloGUI:
     def __init__(self, root):
+        # tkinter はGUIを使うときだけ読み込む（Othello クラスは対戦システムからも使う）
+        global tk, messagebox
+        import tkinter as tk
+        from tkinter import messagebox
         self.root = root
         self.root.title("オセロ")
         self.game = Othello()
+        self.ai = MCTS(time_limit=1.0)
         self.current_player = 1  # プレイヤー1が最初
         self.buttons = [[None for _ in range(8)] for _ in range(8)]
 
@@ -135,7 +626,7 @@ class OthelloGUI:
         # AIの合法手を取得
         legal_moves = self.game.get_legal_moves(self.current_player)
         if legal_moves:
-            move = random.choice(legal_moves)
+            move = self.ai.get_move(self.game.board, self.current_player)
             self.game.make_move(move, self.current_player)
             self.current_player = 3 - self.current_player  # プレイヤー交代
             self.update_board()
@@ -147,6 +638,7 @@ class OthelloGUI:
 
 
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     gui = OthelloGUI(root)
     root.mainloop()
\ No newline at end of file
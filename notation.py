@@ -0,0 +1,15 @@
+from typing import Tuple
+
+# 手の表記（"f5" のような列の文字と行の番号）
+# 対局結果の保存や序盤集の読み書きで使うので、エンジンのモジュールには依存させない
+
+Move = Tuple[int, int]
+
+
+def move_to_str(move: Move) -> str:
+    """(行, 列) を "f5" のような表記にする"""
+    return chr(ord('a') + move[1]) + str(move[0] + 1)
+
+
+def str_to_move(text: str) -> Move:
+    return int(text[1:]) - 1, ord(text[0].lower()) - ord('a')
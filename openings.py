@@ -0,0 +1,86 @@
+import argparse
+import random
+from typing import List, Optional, Tuple
+
+from minimax1 import OthelloBoard, OthelloAI as AI1
+from notation import Move, move_to_str, str_to_move
+from symmetry import canonical_key
+
+
+def play_opening(moves: List[Move]) -> Tuple[List[List[int]], int]:
+    """初期局面から moves を打った盤面と次の手番を返す（1: 黒, 2: 白）"""
+    board = OthelloBoard()
+    player = board.BLACK
+    for move in moves:
+        if not board.get_valid_moves(player):
+            player = 3 - player
+        board.make_move(move[0], move[1], player)
+        player = 3 - player
+    if not board.get_valid_moves(player):
+        player = 3 - player
+    return board.board, player
+
+
+def generate_suite(plies: int, count: Optional[int] = None, max_score: float = 10.0,
+                   eval_depth: int = 2, seed: int = 0) -> List[List[Move]]:
+    """plies 手進めた、どちらにも大きく偏らない序盤の一覧を作る
+
+    対称な局面は1つにまとめ、minimax1 の浅い探索の評価値の絶対値が
+    max_score 以下のものだけを残す。count を指定するとその数だけ無作為に選ぶ。
+    """
+    evaluator = AI1(max_depth=eval_depth, max_time=float('inf'))
+    seen = set()
+    suite = []
+
+    def expand(board: OthelloBoard, player: int, moves: List[Move]):
+        if len(moves) == plies:
+            key = (canonical_key(board.board)[0], player)
+            if key in seen:
+                return
+            seen.add(key)
+            score, _ = evaluator.minimax(board, eval_depth, float('-inf'), float('inf'),
+                                         player == board.BLACK, board.BLACK)
+            if abs(score) <= max_score:
+                suite.append(list(moves))
+            return
+        valid_moves = board.get_valid_moves(player)
+        if not valid_moves:
+            return
+        for move in valid_moves:
+            board.make_move(move[0], move[1], player)
+            expand(board, 3 - player, moves + [move])
+            board.undo_move()
+
+    expand(OthelloBoard(), OthelloBoard().BLACK, [])
+    if count is not None and count < len(suite):
+        suite = random.Random(seed).sample(suite, count)
+    return suite
+
+
+def save_suite(path: str, suite: List[List[Move]]) -> None:
+    with open(path, 'w') as f:
+        for moves in suite:
+            f.write(" ".join(move_to_str(m) for m in moves) + "\n")
+
+
+def load_suite(path: str) -> List[List[Move]]:
+    with open(path) as f:
+        return [[str_to_move(m) for m in line.split()] for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="トーナメント用の序盤集を作る")
+    parser.add_argument('output')
+    parser.add_argument('--plies', type=int, default=4)
+    parser.add_argument('--count', type=int, default=None)
+    parser.add_argument('--max-score', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    suite = generate_suite(args.plies, args.count, args.max_score, seed=args.seed)
+    save_suite(args.output, suite)
+    print(f"{len(suite)} openings written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
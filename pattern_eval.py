@@ -0,0 +1,202 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+# minimax1と同じ石の表現（0: 空, 1: 黒, 2: 白）
+EMPTY, BLACK, WHITE = 0, 1, 2
+
+# 基準となる位置の重み（minimax1.OthelloAI.evaluate_board と同じ表）
+SQUARE_WEIGHTS = [
+    [100, -20, 10, 5, 5, 10, -20, 100],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [10, -2, -1, -1, -1, -1, -2, 10],
+    [5, -2, -1, -1, -1, -1, -2, 5],
+    [5, -2, -1, -1, -1, -1, -2, 5],
+    [10, -2, -1, -1, -1, -1, -2, 10],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [100, -20, 10, 5, 5, 10, -20, 100]
+]
+
+
+def _corner_block(rows, cols):
+    # 隅から外側に向かう順で3x3を並べる（対称な隅で同じインデックスになるように）
+    return [(r, c) for r in rows for c in cols]
+
+
+# パターンの種類ごとに、そのパターンに属するマスの並び（隅から見た順）を定義
+# 同じ種類のパターンは同じ表を共有する
+PATTERN_CLASSES = {
+    'edge': [
+        [(0, i) for i in range(8)],
+        [(7, i) for i in range(8)],
+        [(i, 0) for i in range(8)],
+        [(i, 7) for i in range(8)],
+    ],
+    'diagonal': [
+        [(i, i) for i in range(8)],
+        [(i, 7 - i) for i in range(8)],
+    ],
+    'corner': [
+        _corner_block((0, 1, 2), (0, 1, 2)),
+        _corner_block((0, 1, 2), (7, 6, 5)),
+        _corner_block((7, 6, 5), (0, 1, 2)),
+        _corner_block((7, 6, 5), (7, 6, 5)),
+    ],
+}
+CLASS_NAMES = list(PATTERN_CLASSES)
+
+# 全パターンを平坦化したリスト: (クラス番号, マスの並び)
+PATTERNS: List[Tuple[int, List[Tuple[int, int]]]] = [
+    (ci, cells) for ci, name in enumerate(CLASS_NAMES) for cells in PATTERN_CLASSES[name]
+]
+
+# 各マスが属するパターンとその桁の重み（3のべき乗）
+CELL_PATTERNS: List[List[List[Tuple[int, int]]]] = [[[] for _ in range(8)] for _ in range(8)]
+for _pid, (_ci, _cells) in enumerate(PATTERNS):
+    for _k, (_r, _c) in enumerate(_cells):
+        CELL_PATTERNS[_r][_c].append((_pid, 3 ** _k))
+
+# ゲームの段階（盤上の石数で区切る）
+PHASE_BOUNDS = [20, 36, 52, 64]
+N_PHASES = len(PHASE_BOUNDS)
+# 石数 -> 段階番号の表
+PHASE_OF_COUNT = [next(p for p, b in enumerate(PHASE_BOUNDS) if n <= b) for n in range(65)]
+
+# 段階ごとの係数（序盤は位置、終盤は石数と確定石を重視）
+_POSITION_SCALE = [1.0, 1.0, 0.7, 0.3]
+_DISC_SCALE = [0.0, 0.0, 1.0, 4.0]
+_ANCHOR_BONUS = [8.0, 10.0, 12.0, 12.0]
+
+
+def _decode(index: int, length: int) -> List[int]:
+    values = []
+    for _ in range(length):
+        values.append(index % 3)
+        index //= 3
+    return values
+
+
+def _anchored_run(values: List[int]) -> int:
+    # 辺の両端の隅から同じ色が途切れずに続く石数（黒を正とする）
+    score = 0
+    for seq in (values, values[::-1]):
+        if seq[0] == EMPTY:
+            continue
+        color = seq[0]
+        run = 0
+        for v in seq:
+            if v != color:
+                break
+            run += 1
+        score += run if color == BLACK else -run
+    return score
+
+
+def build_default_tables() -> List[np.ndarray]:
+    """位置の重み表から段階ごとのパターン表を作る
+
+    戻り値はパターンの種類ごとの (段階数, 3**マス数) の配列で、値は黒から見た評価。
+    """
+    # 各マスを覆うパターン数（複数パターンで重複して数えないように按分する）
+    coverage = [[len(CELL_PATTERNS[r][c]) for c in range(8)] for r in range(8)]
+
+    tables = []
+    for name in CLASS_NAMES:
+        cells = PATTERN_CLASSES[name][0]
+        length = len(cells)
+        size = 3 ** length
+        position = np.zeros(size)
+        discs = np.zeros(size)
+        anchored = np.zeros(size)
+        for index in range(size):
+            values = _decode(index, length)
+            for (r, c), v in zip(cells, values):
+                if v == EMPTY:
+                    continue
+                sign = 1 if v == BLACK else -1
+                position[index] += sign * SQUARE_WEIGHTS[r][c] / coverage[r][c]
+                discs[index] += sign / coverage[r][c]
+            if name == 'edge':
+                anchored[index] = _anchored_run(values)
+        table = np.zeros((N_PHASES, size))
+        for phase in range(N_PHASES):
+            table[phase] = (_POSITION_SCALE[phase] * position
+                            + _DISC_SCALE[phase] * discs
+                            + _ANCHOR_BONUS[phase] * anchored)
+        tables.append(table)
+    return tables
+
+
+def save_tables(path: str, tables: List[np.ndarray]) -> None:
+    np.savez(path, **{name: table for name, table in zip(CLASS_NAMES, tables)})
+
+
+def load_tables(path: str) -> List[np.ndarray]:
+    data = np.load(path)
+    return [data[name] for name in CLASS_NAMES]
+
+
+_default_lookup = None
+
+
+def _as_lookup(tables: List[np.ndarray]):
+    # 要素ごとの参照はnumpyよりPythonのリストの方が速いので変換しておく
+    # lookup[段階][パターン番号] -> 値のリスト
+    return [[tables[ci][phase].tolist() for ci, _ in PATTERNS] for phase in range(N_PHASES)]
+
+
+class PatternEvaluator:
+    """辺・隅・対角線のパターンで盤面を評価する
+
+    各パターンを3進数のインデックスとして保持し、石が置かれる・返るたびに
+    該当するインデックスだけを差分更新する。評価はパターン数回の表引きで済む。
+    """
+
+    def __init__(self, board: List[List[int]], tables: Optional[List[np.ndarray]] = None):
+        global _default_lookup
+        if tables is None:
+            if _default_lookup is None:
+                _default_lookup = _as_lookup(build_default_tables())
+            self.lookup = _default_lookup
+        else:
+            self.lookup = _as_lookup(tables)
+        self.reset(board)
+
+    def reset(self, board: List[List[int]]) -> None:
+        self.indices = [0] * len(PATTERNS)
+        self.disc_count = 0
+        for r in range(8):
+            for c in range(8):
+                v = board[r][c]
+                if v != EMPTY:
+                    self.disc_count += 1
+                    for pid, power in CELL_PATTERNS[r][c]:
+                        self.indices[pid] += v * power
+
+    def place(self, row: int, col: int, player: int) -> None:
+        """空きマスに石を置いたときの更新"""
+        self.disc_count += 1
+        indices = self.indices
+        for pid, power in CELL_PATTERNS[row][col]:
+            indices[pid] += player * power
+
+    def remove(self, row: int, col: int, player: int) -> None:
+        """placeの取り消し"""
+        self.disc_count -= 1
+        indices = self.indices
+        for pid, power in CELL_PATTERNS[row][col]:
+            indices[pid] -= player * power
+
+    def flip(self, row: int, col: int, old: int, new: int) -> None:
+        """石が old から new に返ったときの更新（取り消しは old と new を入れ替えて呼ぶ）"""
+        delta = new - old
+        indices = self.indices
+        for pid, power in CELL_PATTERNS[row][col]:
+            indices[pid] += delta * power
+
+    def evaluate(self, player: int) -> float:
+        """playerから見た評価値"""
+        tables = self.lookup[PHASE_OF_COUNT[self.disc_count]]
+        score = 0.0
+        for pid, index in enumerate(self.indices):
+            score += tables[pid][index]
+        return score if player == BLACK else -score
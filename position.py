@@ -0,0 +1,91 @@
+from typing import List, Optional, Tuple
+
+# 審判とエンジンで共有する盤面
+# 基準の表現は battle.py と同じ（0: 空, 1: 黒, 2: 白）。エンジンごとの形式はここで作り、
+# 着手のたびに変化したマスだけを書き換える。エンジンには読み取り専用として渡すので、
+# 探索で盤面を書き換えるエンジンは自分で複製する。
+EMPTY, BLACK, WHITE = 0, 1, 2
+
+
+def signed_player(player: int) -> int:
+    """手番を A_star.py の表現（黒: 1, 白: -1）にする"""
+    return 1 if player == BLACK else -1
+
+
+class Position:
+    """1つの局面を複数の形式で保持する
+
+    rows      リストのリスト（minimax1, monte_carlo）
+    array     int8 の 8x8 配列（minimax2）
+    signed    黒 1 / 白 -1 の int8 の 8x8 配列（A_star）
+    black, white  ビットボード（マス (r, c) がビット r*8+c）
+    numpy の形式は最初に参照されたときに作り、以降は差分で更新する。
+    """
+
+    def __init__(self, rows: Optional[List[List[int]]] = None):
+        if rows is None:
+            rows = [[EMPTY] * 8 for _ in range(8)]
+            rows[3][3] = rows[4][4] = WHITE
+            rows[3][4] = rows[4][3] = BLACK
+        else:
+            rows = [list(row) for row in rows]
+        self.rows = rows
+        self.black = 0
+        self.white = 0
+        for r in range(8):
+            for c in range(8):
+                if rows[r][c] == BLACK:
+                    self.black |= 1 << (r * 8 + c)
+                elif rows[r][c] == WHITE:
+                    self.white |= 1 << (r * 8 + c)
+        self._array = None
+        self._signed = None
+
+    @classmethod
+    def wrap(cls, board) -> 'Position':
+        """Position ならそのまま、リストのリストなら変換して返す"""
+        return board if isinstance(board, Position) else cls(board)
+
+    def set_cells(self, cells: List[Tuple[int, int]], player: int) -> None:
+        """cells の石を player の石にする（打ったマスと返ったマス）"""
+        rows = self.rows
+        bits = 0
+        for r, c in cells:
+            rows[r][c] = player
+            bits |= 1 << (r * 8 + c)
+        if player == BLACK:
+            self.black |= bits
+            self.white &= ~bits
+        else:
+            self.white |= bits
+            self.black &= ~bits
+        if self._array is not None:
+            array, signed, value = self._array.base, self._signed.base, signed_player(player)
+            for r, c in cells:
+                array[r, c] = player
+                signed[r, c] = value
+
+    def _build_arrays(self) -> None:
+        import numpy as np
+        array = np.array(self.rows, dtype=np.int8)
+        signed = np.where(array == WHITE, -1, array).astype(np.int8)
+        # 読み取り専用のビューを渡し、元の配列は set_cells だけが書き換える
+        self._array = array.view()
+        self._array.flags.writeable = False
+        self._signed = signed.view()
+        self._signed.flags.writeable = False
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._build_arrays()
+        return self._array
+
+    @property
+    def signed(self):
+        if self._signed is None:
+            self._build_arrays()
+        return self._signed
+
+    def empty_count(self) -> int:
+        return 64 - (self.black | self.white).bit_count()
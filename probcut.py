@@ -0,0 +1,143 @@
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from minimax1 import OthelloBoard, OthelloAI
+
+# 深い探索の深さ -> 浅い探索の深さ の組（Multi-ProbCut では1つの深さに複数組を使う）
+DEFAULT_PAIRS = [(3, 1), (4, 2), (5, 1), (5, 3), (6, 2), (6, 4)]
+
+
+def sample_positions(count: int, seed: int = 0, random_plies: int = 6) -> List[Tuple[OthelloBoard, int]]:
+    """序盤をランダムに、その後は浅い探索で進めた対局から局面を集める"""
+    rng = random.Random(seed)
+    ai = OthelloAI(max_depth=2, max_time=float('inf'))
+    positions = []
+    while len(positions) < count:
+        board = OthelloBoard()
+        player = board.BLACK
+        ply = 0
+        while len(positions) < count:
+            moves = board.get_valid_moves(player)
+            if not moves:
+                player = 3 - player
+                if not board.get_valid_moves(player):
+                    break
+                continue
+            if ply >= random_plies and rng.random() < 0.3:
+                snapshot = OthelloBoard()
+                snapshot.board = [row[:] for row in board.board]
+                positions.append((snapshot, player))
+            move = rng.choice(moves) if ply < random_plies else ai.get_move(board, player)
+            board.make_move(move[0], move[1], player)
+            player = 3 - player
+            ply += 1
+    return positions
+
+
+def collect_log(positions, pairs=DEFAULT_PAIRS) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+    """各局面で浅い探索と深い探索の値を記録する（探索ログ）"""
+    ai = OthelloAI(max_time=float('inf'))
+    depths = sorted({d for pair in pairs for d in pair})
+    log = {pair: [] for pair in pairs}
+    for board, player in positions:
+        values = {}
+        for depth in depths:
+            values[depth], _ = ai.minimax(board, depth, float('-inf'), float('inf'), True, player)
+        for deep, shallow in pairs:
+            log[(deep, shallow)].append((values[shallow], values[deep]))
+    return log
+
+
+def fit_params(log) -> Dict[int, List[Tuple[int, float, float, float]]]:
+    """深い探索の値 = a * 浅い探索の値 + b + 誤差 を最小二乗で当てはめる"""
+    params: Dict[int, List[Tuple[int, float, float, float]]] = {}
+    for (deep, shallow), samples in sorted(log.items()):
+        data = np.array(samples, dtype=np.float64)
+        a, b = np.polyfit(data[:, 0], data[:, 1], 1)
+        sigma = float(np.std(data[:, 1] - (a * data[:, 0] + b)))
+        params.setdefault(deep, []).append((shallow, round(float(a), 3), round(float(b), 2), round(sigma, 2)))
+    return params
+
+
+def play_match(time_limit: float, games: int, probcut_params, seed: int = 0) -> dict:
+    """同じ持ち時間で ProbCut ありとなしの minimax1 を先後入れ替えて対戦させる"""
+    rng = random.Random(seed)
+    wins = {'probcut': 0, 'plain': 0, 'draw': 0}
+    depths = {'probcut': [], 'plain': []}
+    for game in range(games):
+        engines = {
+            'probcut': OthelloAI(max_depth=64, max_time=time_limit, probcut=probcut_params),
+            'plain': OthelloAI(max_depth=64, max_time=time_limit),
+        }
+        # 2局ごとに同じランダムな序盤から先後を入れ替えて打つ
+        if game % 2 == 0:
+            opening_seed = rng.random()
+        colours = {1: 'probcut', 2: 'plain'} if game % 2 == 0 else {1: 'plain', 2: 'probcut'}
+        opening_rng = random.Random(opening_seed)
+        board = OthelloBoard()
+        player = board.BLACK
+        ply = 0
+        while True:
+            moves = board.get_valid_moves(player)
+            if not moves:
+                player = 3 - player
+                if not board.get_valid_moves(player):
+                    break
+                continue
+            if ply < 4:
+                move = opening_rng.choice(moves)
+            else:
+                name = colours[player]
+                move = engines[name].get_move(board, player) or moves[0]
+                # 終盤は読み切りで深さが伸びるので中盤（石数20〜44）の深さだけを集計する
+                if 20 <= sum(board.get_score()) <= 44:
+                    depths[name].append(engines[name].last_depth)
+            board.make_move(move[0], move[1], player)
+            player = 3 - player
+            ply += 1
+        black, white = board.get_score()
+        if black == white:
+            wins['draw'] += 1
+        else:
+            wins[colours[1] if black > white else colours[2]] += 1
+    return {
+        'wins': wins,
+        'midgame_depth': {name: sum(d) / len(d) if d else 0 for name, d in depths.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="minimax1 の ProbCut パラメータを探索ログから求め、効果を測る")
+    sub = parser.add_subparsers(dest='command', required=True)
+    fit_parser = sub.add_parser('fit')
+    fit_parser.add_argument('output')
+    fit_parser.add_argument('--positions', type=int, default=200)
+    fit_parser.add_argument('--seed', type=int, default=0)
+    compare_parser = sub.add_parser('compare')
+    compare_parser.add_argument('--params', default=None, help="fit で書き出したファイル（省略時は既定値）")
+    compare_parser.add_argument('--time-limit', type=float, default=1.0)
+    compare_parser.add_argument('--games', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'fit':
+        start = time.time()
+        log = collect_log(sample_positions(args.positions, args.seed))
+        params = fit_params(log)
+        with open(args.output, 'w') as f:
+            json.dump(params, f, indent=1)
+        for depth, pairs in sorted(params.items()):
+            print(depth, pairs)
+        print(f"fitted in {time.time() - start:.1f}s")
+    else:
+        result = play_match(args.time_limit, args.games, args.params or True)
+        print(f"wins: {result['wins']}")
+        print(f"average midgame depth: {result['midgame_depth']}")
+
+
+if __name__ == "__main__":
+    main()
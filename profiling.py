@@ -0,0 +1,157 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Optional, Tuple
+
+
+def _frame_name(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class ProfiledEngine:
+    """エンジンの get_move をプロファイラで包む"""
+
+    def __init__(self, engine: object, profiler: object, name: str):
+        self.engine = engine
+        self.profiler = profiler
+        self.name = name
+
+    def get_move(self, board, player):
+        self.profiler.start(self.name)
+        try:
+            return self.engine.get_move(board, player)
+        finally:
+            self.profiler.stop()
+
+    def __getattr__(self, attr):
+        # hit_time_limit などエンジン側の属性はそのまま見せる
+        return getattr(self.engine, attr)
+
+
+class SamplingProfiler:
+    """一定間隔でスタックを採取するプロファイラ
+
+    別スレッドから get_move を実行中のスレッドのスタックを interval 秒ごとに読み、
+    エンジンごとに集計する。計測対象のコードには手を加えないのでオーバーヘッドが小さい。
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)
+        self.calls: Counter = Counter()
+        self._engine: Optional[str] = None
+        self._thread_id: Optional[int] = None
+        self._root_code = ProfiledEngine.get_move.__code__
+        self._sampler: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def wrap(self, engine: object, name: str) -> ProfiledEngine:
+        return ProfiledEngine(engine, self, name)
+
+    def start(self, engine: str) -> None:
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._run, daemon=True)
+            self._sampler.start()
+        self._thread_id = threading.get_ident()
+        self.calls[engine] += 1
+        self._engine = engine
+
+    def stop(self) -> None:
+        self._engine = None
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            engine = self._engine
+            if engine is None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            # get_move を包んだフレームまでさかのぼる（それより外側は対局の管理部分）
+            while frame is not None and frame.f_code is not self._root_code:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[engine][tuple(reversed(stack))] += 1
+
+    def top_functions(self, engine: str, n: int = 20) -> Tuple[list, list]:
+        """(自己時間の上位, 累積時間の上位) をサンプル数で返す"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks[engine].items():
+            self_counts[stack[-1]] += count
+            for name in set(stack):
+                total_counts[name] += count
+        return self_counts.most_common(n), total_counts.most_common(n)
+
+    def write_reports(self, directory: str, n: int = 20) -> None:
+        """エンジンごとに collapsed stack 形式（flamegraph.pl などで描画可能）と上位関数の一覧を書き出す"""
+        os.makedirs(directory, exist_ok=True)
+        for engine, stacks in self.stacks.items():
+            with open(os.path.join(directory, f"{engine}.folded"), 'w') as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(";".join(stack) + f" {count}\n")
+            total = sum(stacks.values())
+            top_self, top_total = self.top_functions(engine, n)
+            with open(os.path.join(directory, f"{engine}.top.txt"), 'w') as f:
+                f.write(f"{engine}: {total} samples ({total * self.interval:.2f}s), "
+                        f"{self.calls[engine]} get_move calls\n\n")
+                f.write("self:\n")
+                for name, count in top_self:
+                    f.write(f"  {count / total * 100:6.2f}%  {name}\n")
+                f.write("\ntotal:\n")
+                for name, count in top_total:
+                    f.write(f"  {count / total * 100:6.2f}%  {name}\n")
+
+
+class DeterministicProfiler:
+    """cProfile による関数単位の計測（呼び出し回数まで正確だがオーバーヘッドは大きい）"""
+
+    def __init__(self):
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.calls: Counter = Counter()
+        self._current: Optional[cProfile.Profile] = None
+
+    def wrap(self, engine: object, name: str) -> ProfiledEngine:
+        return ProfiledEngine(engine, self, name)
+
+    def start(self, engine: str) -> None:
+        self._current = self.profiles.setdefault(engine, cProfile.Profile())
+        self.calls[engine] += 1
+        self._current.enable()
+
+    def stop(self) -> None:
+        if self._current is not None:
+            self._current.disable()
+            self._current = None
+
+    def close(self) -> None:
+        pass
+
+    def write_reports(self, directory: str, n: int = 20) -> None:
+        """エンジンごとに .prof（snakeviz・flameprof などで描画可能）と上位関数の一覧を書き出す"""
+        os.makedirs(directory, exist_ok=True)
+        for engine, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(directory, f"{engine}.prof"))
+            out = io.StringIO()
+            out.write(f"{engine}: {self.calls[engine]} get_move calls\n")
+            pstats.Stats(profile, stream=out).sort_stats('tottime').print_stats(n)
+            with open(os.path.join(directory, f"{engine}.top.txt"), 'w') as f:
+                f.write(out.getvalue())
+
+
+def create_profiler(mode: str):
+    if mode == 'sample':
+        return SamplingProfiler()
+    if mode == 'cprofile':
+        return DeterministicProfiler()
+    raise ValueError(f"unknown profiling mode: {mode}")
@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from position import EMPTY, BLACK, WHITE, Position
+
+DIRECTIONS = [(0,1), (1,0), (0,-1), (-1,0), (1,1), (-1,-1), (1,-1), (-1,1)]
+
+
+class GameState:
+    """対局の進行を管理する審判用の局面
+
+    石数、空きマスの集合、両者の合法手の集合を手を打つたびに差分更新する。
+    石が変化したマスから各方向に石をたどって最初に当たる空きマスだけが
+    合法手の判定をやり直す対象になる。
+    盤面は Position で持ち、エンジンにはその読み取り専用の形式を渡す。
+    """
+
+    def __init__(self):
+        self.position = Position()
+        # リストのリスト形式（Position と共有）
+        self.board = self.position.rows
+        self.counts = {BLACK: 2, WHITE: 2}
+        self.empties: Set[Tuple[int, int]] = {(i, j) for i in range(8) for j in range(8)
+                                              if self.board[i][j] == EMPTY}
+        self.legal: Dict[int, Set[Tuple[int, int]]] = {BLACK: set(), WHITE: set()}
+        for square in self.empties:
+            self._update_square(square)
+
+    def _flips(self, row: int, col: int, player: int) -> List[Tuple[int, int]]:
+        # (row, col) に player が打ったときに返る石
+        board = self.board
+        opponent = 3 - player
+        flips = []
+        for dx, dy in DIRECTIONS:
+            x, y = row + dx, col + dy
+            line = []
+            while 0 <= x < 8 and 0 <= y < 8 and board[x][y] == opponent:
+                line.append((x, y))
+                x, y = x + dx, y + dy
+            if line and 0 <= x < 8 and 0 <= y < 8 and board[x][y] == player:
+                flips.extend(line)
+        return flips
+
+    def _is_legal(self, row: int, col: int, player: int) -> bool:
+        board = self.board
+        opponent = 3 - player
+        for dx, dy in DIRECTIONS:
+            x, y = row + dx, col + dy
+            if not (0 <= x < 8 and 0 <= y < 8) or board[x][y] != opponent:
+                continue
+            x, y = x + dx, y + dy
+            while 0 <= x < 8 and 0 <= y < 8:
+                if board[x][y] == EMPTY:
+                    break
+                if board[x][y] == player:
+                    return True
+                x, y = x + dx, y + dy
+        return False
+
+    def _update_square(self, square: Tuple[int, int]) -> None:
+        for player in (BLACK, WHITE):
+            if self._is_legal(square[0], square[1], player):
+                self.legal[player].add(square)
+            else:
+                self.legal[player].discard(square)
+
+    def is_legal(self, move: Tuple[int, int], player: int) -> bool:
+        return tuple(move) in self.legal[player]
+
+    def has_moves(self, player: int) -> bool:
+        return bool(self.legal[player])
+
+    def is_full(self) -> bool:
+        return not self.empties
+
+    def play(self, move: Tuple[int, int], player: int) -> List[Tuple[int, int]]:
+        """合法手を打ち、返った石のリストを返す（合法性は is_legal で確認済みとする）"""
+        row, col = move
+        board = self.board
+        flips = self._flips(row, col, player)
+        self.position.set_cells([(row, col)] + flips, player)
+        self.counts[player] += len(flips) + 1
+        self.counts[3 - player] -= len(flips)
+        self.empties.discard((row, col))
+        self.legal[BLACK].discard((row, col))
+        self.legal[WHITE].discard((row, col))
+
+        # 石が変化したマスから各方向にたどって最初の空きマスの合法性だけを更新
+        dirty = set()
+        for cx, cy in [(row, col)] + flips:
+            for dx, dy in DIRECTIONS:
+                x, y = cx + dx, cy + dy
+                while 0 <= x < 8 and 0 <= y < 8 and board[x][y] != EMPTY:
+                    x, y = x + dx, y + dy
+                if 0 <= x < 8 and 0 <= y < 8:
+                    dirty.add((x, y))
+        for square in dirty:
+            self._update_square(square)
+        return flips
+
+    @classmethod
+    def from_moves(cls, moves: Optional[List[Tuple[int, int]]]) -> Tuple['GameState', int]:
+        """初期局面から moves を打った局面と次の手番を返す"""
+        state = cls()
+        player = BLACK
+        for move in moves or []:
+            if not state.has_moves(player):
+                player = 3 - player
+            state.play(move, player)
+            player = 3 - player
+        return state, player
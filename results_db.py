@@ -0,0 +1,258 @@
+import argparse
+import bisect
+import json
+import math
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from notation import move_to_str
+
+# 対局結果のデータベース（SQLite）
+# games:    1局ごとの記録（手順と思考時間を含む）
+# results:  1局をそれぞれのエンジンから見た2行（エンジン・相手・手番・序盤・日時で索引を張る）
+# stats:    トーナメント・エンジン・相手・手番・序盤ごとの集計（対局ごとに差分で更新する）
+# latency:  1手の思考時間のヒストグラム（パーセンタイルを集計表だけから求める）
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    tournament INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    black TEXT NOT NULL,
+    white TEXT NOT NULL,
+    opening TEXT NOT NULL,
+    black_score INTEGER NOT NULL,
+    white_score INTEGER NOT NULL,
+    moves TEXT NOT NULL,
+    times TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    game INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    colour INTEGER NOT NULL,
+    opening TEXT NOT NULL,
+    played_at REAL NOT NULL,
+    outcome REAL NOT NULL,
+    move_count INTEGER NOT NULL,
+    think_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_engine ON results (engine, played_at, outcome, move_count, think_time);
+CREATE INDEX IF NOT EXISTS results_opponent ON results (opponent, played_at);
+CREATE INDEX IF NOT EXISTS results_colour ON results (colour, played_at);
+CREATE INDEX IF NOT EXISTS results_opening ON results (opening, played_at);
+CREATE INDEX IF NOT EXISTS results_date ON results (played_at, outcome, move_count, think_time);
+CREATE TABLE IF NOT EXISTS stats (
+    tournament INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    colour INTEGER NOT NULL,
+    opening TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    move_count INTEGER NOT NULL,
+    think_time REAL NOT NULL,
+    PRIMARY KEY (tournament, engine, opponent, colour, opening)
+);
+CREATE TABLE IF NOT EXISTS latency (
+    tournament INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tournament, engine, bucket)
+);
+"""
+
+# 思考時間のヒストグラムの区切り（1ms 未満をまとめ、以降は 5% 刻みの対数目盛り）
+LATENCY_MIN = 0.001
+LATENCY_STEP = 1.05
+
+
+def latency_bucket(seconds: float) -> int:
+    if seconds <= LATENCY_MIN:
+        return 0
+    return 1 + int(math.log(seconds / LATENCY_MIN, LATENCY_STEP))
+
+
+def bucket_upper_bound(bucket: int) -> float:
+    """その区間に入る思考時間の上限（秒）"""
+    return LATENCY_MIN * LATENCY_STEP ** bucket
+
+
+def opening_key(start_moves: Optional[Iterable[Tuple[int, int]]]) -> str:
+    return "".join(move_to_str(move) for move in start_moves) if start_moves else ""
+
+
+class ResultsDB:
+    """トーナメントの対局結果を保存・集計する"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        # 1局ごとにコミットするので WAL にして書き込みごとの fsync を減らす
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def start_tournament(self, config: str) -> int:
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO tournaments (started_at, config) VALUES (?, ?)",
+                                       (time.time(), config))
+        return cursor.lastrowid
+
+    def record_game(self, tournament: int, black: str, white: str, result: dict,
+                    start_moves: Optional[List[Tuple[int, int]]] = None,
+                    played_at: Optional[float] = None) -> int:
+        """Tournament.play_single_game の結果を1つのトランザクションで記録し、集計を差分更新する
+
+        キャッシュから使い回した結果（result['cached']）は対局として数えるが、思考時間は以前の
+        実行のものなので、平均思考時間とヒストグラムには入れない。
+        """
+        played_at = time.time() if played_at is None else played_at
+        opening = opening_key(start_moves)
+        moves, times = result['moves'], result['times']
+        # 手順の番号と手番の対応（白番から始まる序盤では偶数番目が白の手）
+        black_start = result['first_player'] - 1
+        diff = result['black_score'] - result['white_score']
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO games (tournament, played_at, black, white, opening, black_score, white_score,"
+                " moves, times) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (tournament, played_at, black, white, opening, result['black_score'], result['white_score'],
+                 json.dumps(moves), json.dumps(times)))
+            game = cursor.lastrowid
+            for colour, engine, opponent, start, sign in ((1, black, white, black_start, 1),
+                                                          (2, white, black, 1 - black_start, -1)):
+                # 審判が処理したパス（手なし・時間0）はエンジンの思考ではないので数えない
+                thought = [t for move, t in zip(moves[start::2], times[start::2])
+                           if move is not None or t > 0] if not result.get('cached') else []
+                outcome = 0.5 if diff == 0 else float(sign * diff > 0)
+                self.conn.execute(
+                    "INSERT INTO results (game, engine, opponent, colour, opening, played_at, outcome,"
+                    " move_count, think_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (game, engine, opponent, colour, opening, played_at, outcome, len(thought), sum(thought)))
+                self.conn.execute(
+                    "INSERT INTO stats VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?)"
+                    " ON CONFLICT (tournament, engine, opponent, colour, opening) DO UPDATE SET"
+                    " games = games + 1, wins = wins + excluded.wins, draws = draws + excluded.draws,"
+                    " move_count = move_count + excluded.move_count,"
+                    " think_time = think_time + excluded.think_time",
+                    (tournament, engine, opponent, colour, opening, int(outcome == 1.0), int(outcome == 0.5),
+                     len(thought), sum(thought)))
+                buckets: Dict[int, int] = {}
+                for t in thought:
+                    bucket = latency_bucket(t)
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+                self.conn.executemany(
+                    "INSERT INTO latency VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (tournament, engine, bucket) DO UPDATE SET count = count + excluded.count",
+                    [(tournament, engine, bucket, count) for bucket, count in buckets.items()])
+        return game
+
+    def standings(self, tournament: Optional[int] = None) -> Dict[str, dict]:
+        """エンジンごとの成績（集計表から求めるので対局数によらず速い）"""
+        where, params = ("WHERE tournament = ?", (tournament,)) if tournament is not None else ("", ())
+        rows = self.conn.execute(
+            "SELECT engine, SUM(games), SUM(wins), SUM(draws), SUM(move_count), SUM(think_time)"
+            f" FROM stats {where} GROUP BY engine", params).fetchall()
+        return {engine: self._summary(games, wins, draws, move_count, think_time)
+                for engine, games, wins, draws, move_count, think_time in rows}
+
+    def latency_percentiles(self, engine: str, tournament: Optional[int] = None,
+                            percentiles: Tuple[float, ...] = (50, 90, 99)) -> Dict[float, float]:
+        """思考時間のパーセンタイル（秒、ヒストグラムの区間の上限で 5% 程度の誤差がある）"""
+        where, params = "engine = ?", (engine,)
+        if tournament is not None:
+            where, params = where + " AND tournament = ?", params + (tournament,)
+        rows = self.conn.execute(
+            f"SELECT bucket, SUM(count) FROM latency WHERE {where} GROUP BY bucket ORDER BY bucket",
+            params).fetchall()
+        if not rows:
+            return {}
+        cumulative = []
+        total = 0
+        for _, count in rows:
+            total += count
+            cumulative.append(total)
+        return {p: bucket_upper_bound(rows[min(bisect.bisect_left(cumulative, total * p / 100),
+                                               len(rows) - 1)][0])
+                for p in percentiles}
+
+    def query(self, engine: Optional[str] = None, opponent: Optional[str] = None,
+              colour: Optional[int] = None, opening: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> dict:
+        """条件に合う対局の成績（エンジン側から見た値）
+
+        期間を指定しなければ集計表だけから求める。期間を指定したときは索引で
+        その期間の対局に絞り込んでから集計する。
+        """
+        conditions, params = [], []
+        for column, value in (('engine', engine), ('opponent', opponent), ('colour', colour),
+                              ('opening', opening)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is None and until is None:
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            row = self.conn.execute(
+                "SELECT SUM(games), SUM(wins), SUM(draws), SUM(move_count), SUM(think_time)"
+                f" FROM stats {where}", params).fetchone()
+            return self._summary(*(value or 0 for value in row))
+
+        if since is not None:
+            conditions.append("played_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("played_at < ?")
+            params.append(until)
+        row = self.conn.execute(
+            "SELECT COUNT(*), SUM(outcome = 1.0), SUM(outcome = 0.5), SUM(move_count), SUM(think_time)"
+            " FROM results WHERE " + " AND ".join(conditions), params).fetchone()
+        return self._summary(*(value or 0 for value in row))
+
+    @staticmethod
+    def _summary(games: int, wins: int, draws: int, move_count: int, think_time: float) -> dict:
+        return {
+            'games': games, 'wins': wins, 'draws': draws, 'losses': games - wins - draws,
+            'win_rate': wins / games if games else 0.0,
+            'avg_time': think_time / move_count if move_count else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="対局結果データベースの集計を表示する")
+    parser.add_argument('database')
+    parser.add_argument('--engine', default=None)
+    parser.add_argument('--opponent', default=None)
+    parser.add_argument('--colour', type=int, choices=[1, 2], default=None)
+    parser.add_argument('--opening', default=None, help='"f5d6c3" のような序盤の手順')
+    parser.add_argument('--days', type=float, default=None, help="直近の日数に絞る")
+    args = parser.parse_args()
+
+    db = ResultsDB(args.database)
+    if args.engine is None:
+        for engine, summary in sorted(db.standings().items()):
+            percentiles = db.latency_percentiles(engine)
+            print(f"{engine:12} {summary['games']:7}局 勝率 {summary['win_rate'] * 100:5.1f}% "
+                  f"平均 {summary['avg_time']:.3f}秒 "
+                  + " ".join(f"p{p:g} {t:.3f}秒" for p, t in percentiles.items()))
+    else:
+        since = time.time() - args.days * 86400 if args.days is not None else None
+        summary = db.query(args.engine, args.opponent, args.colour, args.opening, since)
+        print(f"{args.engine}: {summary['games']}局 {summary['wins']}勝 {summary['losses']}敗 "
+              f"{summary['draws']}分 勝率 {summary['win_rate'] * 100:.1f}% 平均 {summary['avg_time']:.3f}秒")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
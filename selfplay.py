@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import random
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from minimax1 import OthelloBoard, OthelloAI as AI1
+
+# 盤面の表現は battle.py と同じ（0: 空, 1: 黒, 2: 白）
+BLACK, WHITE = 1, 2
+
+
+# 自己対戦で使うエンジン（盤面のリストと手番を受け取り手を返す関数を作る）
+def _random_engine(rng):
+    def get_move(board: OthelloBoard, player: int):
+        moves = board.get_valid_moves(player)
+        return rng.choice(moves) if moves else None
+    return get_move
+
+
+def _minimax1_engine(depth):
+    def factory(rng):
+        ai = AI1(max_depth=depth, max_time=float('inf'))
+        return lambda board, player: ai.get_move(board, player)
+    return factory
+
+
+ENGINES = {
+    'random': _random_engine,
+    'minimax1-d2': _minimax1_engine(2),
+    'minimax1-d3': _minimax1_engine(3),
+    'minimax1-d4': _minimax1_engine(4),
+}
+
+
+def play_selfplay_game(args) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """1局自己対戦してサンプルした局面を返す
+
+    戻り値は (盤面 (n, 2, 8, 8) uint8, 手番 (n,) int8, ラベル (n,) float32)。
+    ラベルは黒から見た値（最終石差または深い探索の評価値）。
+    """
+    black_name, white_name, seed, random_plies, sample_prob, label_mode, label_depth = args
+    rng = random.Random(seed)
+    engines = {BLACK: ENGINES[black_name](rng), WHITE: ENGINES[white_name](rng)}
+    labeller = AI1(max_depth=label_depth, max_time=float('inf')) if label_mode == 'search' else None
+
+    board = OthelloBoard()
+    player = BLACK
+    ply = 0
+    samples: List[Tuple[List[List[int]], int]] = []
+    search_labels: List[float] = []
+
+    while True:
+        moves = board.get_valid_moves(player)
+        if not moves:
+            player = 3 - player
+            if not board.get_valid_moves(player):
+                break
+            continue
+
+        if ply >= random_plies and rng.random() < sample_prob:
+            samples.append(([row[:] for row in board.board], player))
+            if labeller is not None:
+                score, _ = labeller.minimax(board, label_depth, float('-inf'), float('inf'), True, player)
+                search_labels.append(score if player == BLACK else -score)
+
+        if ply < random_plies:
+            # 序盤はランダムに打って対局を多様化する
+            move = rng.choice(moves)
+        else:
+            move = engines[player](board, player)
+            if move is None or move not in moves:
+                move = moves[0]
+        board.make_move(move[0], move[1], player)
+        player = 3 - player
+        ply += 1
+
+    black_score, white_score = board.get_score()
+    n = len(samples)
+    planes = np.zeros((n, 2, 8, 8), dtype=np.uint8)
+    side = np.zeros(n, dtype=np.int8)
+    for i, (cells, to_move) in enumerate(samples):
+        arr = np.array(cells, dtype=np.int8)
+        planes[i, 0] = arr == BLACK
+        planes[i, 1] = arr == WHITE
+        side[i] = 1 if to_move == BLACK else -1
+    if labeller is not None:
+        labels = np.array(search_labels, dtype=np.float32)
+    else:
+        labels = np.full(n, black_score - white_score, dtype=np.float32)
+    return planes, side, labels
+
+
+def create_dataset(path: str, capacity: int) -> Dict[str, np.ndarray]:
+    """容量 capacity のメモリマップ配列をあらかじめ確保する"""
+    os.makedirs(path, exist_ok=True)
+    open_memmap = np.lib.format.open_memmap
+    return {
+        'boards': open_memmap(os.path.join(path, 'boards.npy'), mode='w+', dtype=np.uint8, shape=(capacity, 2, 8, 8)),
+        'side': open_memmap(os.path.join(path, 'side.npy'), mode='w+', dtype=np.int8, shape=(capacity,)),
+        'label': open_memmap(os.path.join(path, 'label.npy'), mode='w+', dtype=np.float32, shape=(capacity,)),
+    }
+
+
+def load_dataset(path: str) -> Dict[str, np.ndarray]:
+    """データセットを読み取り専用のメモリマップとして開く（コピーは発生しない）"""
+    with open(os.path.join(path, 'meta.json')) as f:
+        count = json.load(f)['count']
+    return {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')[:count]
+            for name in ('boards', 'side', 'label')}
+
+
+def generate(path: str, positions: int, pairs: List[Tuple[str, str]], workers: Optional[int] = None,
+             random_plies: int = 8, sample_prob: float = 0.25, label_mode: str = 'outcome',
+             label_depth: int = 4, seed: int = 0) -> int:
+    """プロセスプールで自己対戦し、positions 局面に達するまでデータセットに書き込む"""
+    arrays = create_dataset(path, positions)
+    count = 0
+    game = 0
+
+    with Pool(workers) as pool:
+        # 無限に投入するとタスクが溜まり続けるので、一定数ずつまとめて投入する
+        batch_size = (workers or os.cpu_count() or 1) * 8
+        while count < positions:
+            batch = []
+            for _ in range(batch_size):
+                black, white = pairs[game % len(pairs)]
+                batch.append((black, white, seed + game, random_plies, sample_prob, label_mode, label_depth))
+                game += 1
+            for planes, side, labels in pool.imap_unordered(play_selfplay_game, batch):
+                n = min(len(labels), positions - count)
+                arrays['boards'][count:count + n] = planes[:n]
+                arrays['side'][count:count + n] = side[:n]
+                arrays['label'][count:count + n] = labels[:n]
+                count += n
+                if count >= positions:
+                    break
+
+    for array in arrays.values():
+        array.flush()
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'count': count, 'pairs': pairs, 'label_mode': label_mode,
+                   'random_plies': random_plies, 'sample_prob': sample_prob, 'seed': seed}, f)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自己対戦で学習用の局面データを生成する")
+    parser.add_argument('path')
+    parser.add_argument('--positions', type=int, default=100000)
+    parser.add_argument('--pair', action='append', default=None,
+                        help="黒エンジン:白エンジン（複数指定可）。選択肢: " + ", ".join(ENGINES))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--random-plies', type=int, default=8)
+    parser.add_argument('--sample-prob', type=float, default=0.25)
+    parser.add_argument('--label', choices=['outcome', 'search'], default='outcome')
+    parser.add_argument('--label-depth', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = [tuple(p.split(':')) for p in (args.pair or ['minimax1-d2:minimax1-d2'])]
+    for pair in pairs:
+        for name in pair:
+            if name not in ENGINES:
+                parser.error(f"unknown engine: {name}")
+    count = generate(args.path, args.positions, pairs, args.workers, args.random_plies,
+                     args.sample_prob, args.label, args.label_depth, args.seed)
+    print(f"{count} positions written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
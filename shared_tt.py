@@ -0,0 +1,129 @@
+import struct
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 置換表のエントリの種類（保存した値が正確な値か、下限か、上限か）
+EXACT, LOWER, UPPER = 1, 2, 3
+NO_MOVE = 64
+
+# Zobrist ハッシュ用の乱数表（0: 空, 1: 黒, 2: 白 の石がどのマスにあるか）
+# 全プロセスで同じ値になるよう種を固定する
+_rng = np.random.default_rng(20240101)
+ZOBRIST = _rng.integers(1, 2 ** 63, size=(64, 3), dtype=np.uint64)
+ZOBRIST[:, 0] = 0
+ZOBRIST_WHITE_TO_MOVE = int(_rng.integers(1, 2 ** 63, dtype=np.uint64))
+_SQUARES = np.arange(64)
+_MASK64 = (1 << 64) - 1
+
+
+def position_key(board, side_to_move: int) -> int:
+    """盤面（リストのリストまたは numpy 配列, 1: 黒, 2: 白）と手番から64ビットのキーを作る"""
+    cells = np.asarray(board).reshape(64)
+    key = int(np.bitwise_xor.reduce(ZOBRIST[_SQUARES, cells]))
+    return key ^ ZOBRIST_WHITE_TO_MOVE if side_to_move == 2 else key
+
+
+def _pack(depth: int, bound: int, score: float, move: Optional[Tuple[int, int]]) -> int:
+    score_bits = struct.unpack('<I', struct.pack('<f', score))[0]
+    move_index = NO_MOVE if move is None else move[0] * 8 + move[1]
+    return (score_bits << 32) | ((depth & 0xFF) << 16) | (bound << 8) | move_index
+
+
+def _unpack(data: int) -> Tuple[int, int, float, Optional[Tuple[int, int]]]:
+    score = struct.unpack('<f', struct.pack('<I', data >> 32))[0]
+    move_index = data & 0xFF
+    move = None if move_index == NO_MOVE else (move_index // 8, move_index % 8)
+    return (data >> 16) & 0xFF, (data >> 8) & 0xFF, score, move
+
+
+class SharedTranspositionTable:
+    """複数プロセスから共有できる固定サイズの置換表
+
+    各エントリは2つの64ビット語（データ, キー XOR データ）で、ロックを使わない。
+    書き込みが途中で他のプロセスと混ざっても、読み出し時にキーが一致しないので
+    壊れたエントリは単にヒットしなかったものとして扱われる。
+    統計（ヒット・衝突・上書き）は接続したプロセスごとに数える。
+    """
+
+    HEADER_WORDS = 2
+    # エンジン側で shared_tt（numpy）を直接インポートせずに使えるようにする
+    EXACT, LOWER, UPPER = EXACT, LOWER, UPPER
+    position_key = staticmethod(position_key)
+
+    @staticmethod
+    def flip_bound(bound: int) -> int:
+        """値の符号を反転したときの種類（下限と上限が入れ替わる）"""
+        return {LOWER: UPPER, UPPER: LOWER}.get(bound, bound)
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        words = np.ndarray((shm.size // 8,), dtype=np.uint64, buffer=shm.buf)
+        self.size = int(words[0])
+        self.entries = words[self.HEADER_WORDS:self.HEADER_WORDS + 2 * self.size].reshape(self.size, 2)
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @classmethod
+    def create(cls, size: int, name: Optional[str] = None) -> 'SharedTranspositionTable':
+        """size 個のエントリを持つ表を共有メモリ上に作る"""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=(cls.HEADER_WORDS + 2 * size) * 8)
+        words = np.ndarray((shm.size // 8,), dtype=np.uint64, buffer=shm.buf)
+        words[:] = 0
+        words[0] = size
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedTranspositionTable':
+        """他のプロセスが作った表に接続する"""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, Optional[Tuple[int, int]]]]:
+        """(深さ, 種類, 値, 最善手) を返す。見つからなければ None"""
+        self.probes += 1
+        data, check = self.entries[key % self.size].tolist()
+        if data == 0 and check == 0:
+            return None
+        if (check ^ data) != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return _unpack(data)
+
+    def store(self, key: int, depth: int, bound: int, score: float,
+              move: Optional[Tuple[int, int]] = None) -> None:
+        slot = self.entries[key % self.size]
+        old_data, old_check = slot.tolist()
+        if old_data != 0 or old_check != 0:
+            if (old_check ^ old_data) == key:
+                # 同じ局面なら浅い探索の結果で深い結果を消さない
+                if _unpack(old_data)[0] > depth:
+                    return
+            else:
+                self.overwrites += 1
+        data = _pack(depth, bound, score, move)
+        slot[0] = data
+        slot[1] = (key ^ data) & _MASK64
+        self.stores += 1
+
+    def stats(self) -> dict:
+        return {
+            'probes': self.probes, 'hits': self.hits, 'collisions': self.collisions,
+            'stores': self.stores, 'overwrites': self.overwrites,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+    def close(self) -> None:
+        del self.entries
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
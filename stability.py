@@ -0,0 +1,166 @@
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+# 確定石（以後どの手を打っても裏返らない石）の計算
+# 盤面はビットボード（マス (r, c) がビット r*8+c）で扱う。
+# 石が裏返るのは横・縦・2つの斜めのどれかの軸で挟まれたときなので、4つの軸のそれぞれで
+#   その軸の列が端から端まで埋まっている（もう打てないので、この軸では挟まれない）
+#   軸上の隣のどちらかが盤の外か、同じ色の確定石
+# のどちらかを満たす石は確定している。確定石のない状態から条件を満たす石を加えることを
+# 変化がなくなるまで繰り返すので、隅や辺から内側へ広がる確定石をすべて見つけられる
+# （相手の石の並び方まで考えた完全な判定ではなく、必ず確定している石だけを数える）。
+
+FULL_MASK = (1 << 64) - 1
+COL0 = sum(1 << (r * 8) for r in range(8))
+COL7 = COL0 << 7
+ROW0 = 0xFF
+ROW7 = ROW0 << 56
+BORDER = COL0 | COL7 | ROW0 | ROW7
+NOT_COL0 = FULL_MASK & ~COL0
+NOT_COL7 = FULL_MASK & ~COL7
+
+# 斜めの列（斜め: r - c が一定, 逆斜め: r + c が一定）。盤の端のマスは EDGES で
+# どの斜めの軸でも挟まれないので、内側のマスを含む長さ3以上の列だけを調べる
+DIAGONALS = [sum(1 << (r * 8 + r - d) for r in range(8) if 0 <= r - d < 8) for d in range(-5, 6)]
+ANTI_DIAGONALS = [sum(1 << (r * 8 + s - r) for r in range(8) if 0 <= s - r < 8) for s in range(2, 13)]
+# 軸ごとに、軸上の隣の一方が盤の外になるマス
+EDGES = (COL0 | COL7, ROW0 | ROW7, BORDER, BORDER)
+
+# 石の過半数（これを超える確定石を持てば勝ちが決まる）
+HALF_BOARD = 32
+
+
+def full_lines(occupied: int) -> Tuple[int, int, int, int]:
+    """軸ごとに、端から端まで埋まった列に含まれるマスの集合（横, 縦, 斜め, 逆斜め）"""
+    # 横と縦は半分ずつずらして AND を取り、列の先頭のマスに列全体の AND を集めてから広げる
+    rows = occupied & (occupied >> 4)
+    rows &= rows >> 2
+    rows &= rows >> 1
+    horizontal = (rows & COL0) * 0xFF
+    cols = occupied & (occupied >> 32)
+    cols &= cols >> 16
+    cols &= cols >> 8
+    vertical = (cols & ROW0) * COL0
+    diagonal = 0
+    for line in DIAGONALS:
+        if occupied & line == line:
+            diagonal |= line
+    anti_diagonal = 0
+    for line in ANTI_DIAGONALS:
+        if occupied & line == line:
+            anti_diagonal |= line
+    return horizontal, vertical, diagonal, anti_diagonal
+
+
+def _stable(own: int, safe: List[int]) -> int:
+    # safe は軸ごとの、その軸では挟まれることのないマス（列が埋まっているか盤の端）
+    h, v, d, a = safe
+    stable = 0
+    while True:
+        s = stable
+        new = (own
+               & (h | ((s << 1) & NOT_COL0) | ((s >> 1) & NOT_COL7))
+               & (v | ((s << 8) & FULL_MASK) | (s >> 8))
+               & (d | ((s << 9) & NOT_COL0) | ((s >> 9) & NOT_COL7))
+               & (a | ((s << 7) & NOT_COL7) | ((s >> 7) & NOT_COL0)))
+        if new == stable:
+            return stable
+        stable = new
+
+
+def _safe_masks(own: int, opp: int) -> List[int]:
+    full = full_lines(own | opp)
+    return [full[i] | EDGES[i] for i in range(4)]
+
+
+def stable_discs(own: int, opp: int) -> int:
+    """own の確定石の集合（ビットボード）"""
+    return _stable(own, _safe_masks(own, opp))
+
+
+def stable_counts(black: int, white: int) -> Tuple[int, int]:
+    """(黒の確定石の数, 白の確定石の数)"""
+    safe = _safe_masks(black, white)
+    return _stable(black, safe).bit_count(), _stable(white, safe).bit_count()
+
+
+def decided_winner(black: int, white: int) -> int:
+    """確定石が盤の半分を超えた側（1: 黒, 2: 白）。決まっていなければ 0"""
+    # 石が半分を超えていなければ確定石も超えないので計算しない
+    if black.bit_count() > HALF_BOARD or white.bit_count() > HALF_BOARD:
+        stable_black, stable_white = stable_counts(black, white)
+        if stable_black > HALF_BOARD:
+            return 1
+        if stable_white > HALF_BOARD:
+            return 2
+    return 0
+
+
+def rows_to_bitboards(rows) -> Tuple[int, int]:
+    """リストのリストの盤面（0: 空, 1: 黒, 2: 白）を (黒, 白) のビットボードにする"""
+    black = white = 0
+    bit = 1
+    for row in rows:
+        for cell in row:
+            if cell == 1:
+                black |= bit
+            elif cell == 2:
+                white |= bit
+            bit <<= 1
+    return black, white
+
+
+def random_positions(count: int, seed: int = 0) -> List[Tuple[int, int, int]]:
+    """無作為な対局の途中局面 (黒, 白, 石の数) を集める"""
+    from monte_carlo import legal_moves, play
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        own, opp = 0x0000000810000000, 0x0000001008000000
+        black_to_move = True
+        passes = 0
+        while passes < 2:
+            moves = legal_moves(own, opp)
+            if moves:
+                passes = 0
+                squares = [i for i in range(64) if moves >> i & 1]
+                own, opp = play(own, opp, rng.choice(squares))
+            else:
+                passes += 1
+                own, opp = opp, own
+            black_to_move = not black_to_move
+            black, white = (own, opp) if black_to_move else (opp, own)
+            positions.append((black, white, (black | white).bit_count()))
+    return positions[:count]
+
+
+def measure_cost(positions: int = 2000, repeat: int = 5, seed: int = 0) -> dict:
+    """stable_counts 1回あたりの時間（秒）を盤面の石の数の段階ごとに計測する"""
+    samples = random_positions(positions, seed)
+    result = {}
+    for name, low, high in (('opening', 0, 20), ('midgame', 21, 44), ('endgame', 45, 64), ('all', 0, 64)):
+        boards = [(black, white) for black, white, discs in samples if low <= discs <= high]
+        if not boards:
+            continue
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for black, white in boards:
+                stable_counts(black, white)
+        result[name] = (time.perf_counter() - start) / (len(boards) * repeat)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="確定石の計算1回あたりの時間を計測する")
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for name, seconds in measure_cost(args.positions, args.repeat, args.seed).items():
+        print(f"{name:8} {seconds * 1e6:7.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+from typing import Tuple
+
+# 盤面の8つの対称変換（回転・反転）
+# 各変換は (row, col) -> (row', col') の写像
+_TRANSFORMS = [
+    lambda r, c: (r, c),          # 0: 恒等
+    lambda r, c: (c, 7 - r),      # 1: 90度回転
+    lambda r, c: (7 - r, 7 - c),  # 2: 180度回転
+    lambda r, c: (7 - c, r),      # 3: 270度回転
+    lambda r, c: (r, 7 - c),      # 4: 左右反転
+    lambda r, c: (7 - r, c),      # 5: 上下反転
+    lambda r, c: (c, r),          # 6: 主対角線で反転
+    lambda r, c: (7 - c, 7 - r),  # 7: 副対角線で反転
+]
+
+# 各変換の逆変換（回転90/270度のみ互いに逆、それ以外は自己逆）
+INVERSE = [0, 3, 2, 1, 4, 5, 6, 7]
+
+# 変換後の盤面の各マスが元の盤面のどのマスから来るかを表すインデックス表
+# transformed.flat[_PERMS[t][k]] ではなく transformed = flat[_PERMS[t]]
+_PERMS = np.zeros((8, 64), dtype=np.intp)
+for _t, _f in enumerate(_TRANSFORMS):
+    for _r in range(8):
+        for _c in range(8):
+            _nr, _nc = _f(_r, _c)
+            _PERMS[_t, _nr * 8 + _nc] = _r * 8 + _c
+
+
+def transform_move(move: Tuple[int, int], t: int) -> Tuple[int, int]:
+    """手の座標に変換tを適用する"""
+    return _TRANSFORMS[t](move[0], move[1])
+
+
+def inverse_move(move: Tuple[int, int], t: int) -> Tuple[int, int]:
+    """変換tで写した盤面上の手を元の盤面の座標に戻す"""
+    return _TRANSFORMS[INVERSE[t]](move[0], move[1])
+
+
+def transform_board(board, t: int) -> np.ndarray:
+    """盤面に変換tを適用した8x8配列を返す"""
+    flat = np.asarray(board).reshape(64)
+    return flat[_PERMS[t]].reshape(8, 8)
+
+
+def canonical_key(board) -> Tuple[bytes, int]:
+    """8つの対称形のうち辞書順最小のものをキーとして返す
+
+    戻り値は (キー, そのキーを得るのに使った変換番号)。
+    リストの盤面とnumpy配列の盤面の両方を受け付ける。
+    """
+    flat = np.asarray(board, dtype=np.int8).reshape(64)
+    # 8つの変換を一度のインデックス参照でまとめて計算
+    variants = flat[_PERMS]
+    keys = [variants[t].tobytes() for t in range(8)]
+    best = min(range(8), key=keys.__getitem__)
+    return keys[best], best
+
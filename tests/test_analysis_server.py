@@ -0,0 +1,80 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from analysis_server import AnalysisService, make_handler
+from engines import register_engine
+from position import Position
+
+
+class FailingEngine:
+    def __init__(self, time_limit, **options):
+        pass
+
+    def get_move(self, board, player):
+        raise ValueError("engine bug")
+
+
+register_engine("test-failing", FailingEngine)
+
+
+@pytest.fixture
+def server():
+    service = AnalysisService(workers=1)
+    # テストではエンジンを登録したこのプロセスで解析する
+    service.pool.shutdown()
+    service.pool = ThreadPoolExecutor(1)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.pool.shutdown()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, json.dumps(body).encode(), {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def start_board():
+    return Position().rows
+
+
+def test_bad_cell_is_client_error(server):
+    _, url = server
+    board = start_board()
+    board[0][0] = 3
+    status, body = post(url + "/analyze", {'board': board, 'engine': 'minimax2'})
+    assert status == 400
+    assert 'error' in body
+
+
+def test_engine_failure_is_server_error(server):
+    _, url = server
+    status, body = post(url + "/analyze", {'board': start_board(), 'engine': 'test-failing'})
+    assert status == 500
+    assert 'engine bug' in body['error']
+
+
+def test_cache_is_keyed_by_exact_board(server):
+    service, url = server
+    board = start_board()
+    status, first = post(url + "/analyze", {'board': board, 'engine': 'minimax2'})
+    assert status == 200 and not first['cached']
+    _, again = post(url + "/analyze", {'board': board, 'engine': 'minimax2'})
+    assert again['cached'] and again['move'] == first['move']
+    # 回転した局面はキャッシュを使わずに読み直す
+    rotated = [list(row) for row in zip(*board[::-1])]
+    _, other = post(url + "/analyze", {'board': rotated, 'engine': 'minimax2'})
+    assert not other['cached']
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from battle import Tournament
+from engines import create_engine, register_engine
+from openings import play_opening
+from notation import str_to_move
+from position import Position
+
+MIDGAME = "f5f4f3f6d3f2g6c3b3b2g4g3b1d2c4c5f1g2g1g5c6a1h6a2b5c7f7d6c2h5"
+
+
+def midgame():
+    rows, player = play_opening([str_to_move(MIDGAME[i:i + 2]) for i in range(0, len(MIDGAME), 2)])
+    return Position(rows), player
+
+
+@pytest.mark.parametrize("engine", ["minimax1", "minimax2", "astar", "montecarlo"])
+def test_engine_follows_clock(engine):
+    # 残り1秒では1手に使える時間は0.1秒程度なので、固定の深さや回数まで読まずに返す
+    position, player = midgame()
+    ai = create_engine(engine, 5.0)
+    ai.set_clock(1.0, 0.0)
+    start = time.perf_counter()
+    move = ai.get_move(position, player)
+    assert time.perf_counter() - start < 0.5
+    assert move is not None and position.rows[move[0]][move[1]] == 0
+
+
+class NoClockEngine:
+    def __init__(self, time_limit, **options):
+        pass
+
+    def get_move(self, board, player):
+        return None
+
+
+register_engine("test-no-clock", NoClockEngine)
+
+
+def test_clocked_match_needs_clock_support():
+    tournament = Tournament(clock=(60.0, 0.0))
+    with pytest.raises(ValueError):
+        tournament.create_ai("test-no-clock")
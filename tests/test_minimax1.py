@@ -0,0 +1,52 @@
+from minimax1 import OthelloAI, OthelloBoard
+from pattern_eval import PatternEvaluator
+
+
+def test_pattern_mode_returns_legal_move():
+    board = OthelloBoard()
+    move = OthelloAI(max_depth=3, max_time=float('inf'), eval_mode='pattern').get_move(board, board.BLACK)
+    assert move in board.get_valid_moves(board.BLACK)
+
+
+def test_pattern_updates_match_fresh_evaluator():
+    # make_move / undo_move の差分更新が、盤面から作り直した評価と一致する
+    board = OthelloBoard()
+    board.patterns = PatternEvaluator(board.board)
+    player = board.BLACK
+    for _ in range(12):
+        moves = board.get_valid_moves(player)
+        if moves:
+            board.make_move(*moves[0], player)
+        player = board.WHITE if player == board.BLACK else board.BLACK
+        fresh = PatternEvaluator(board.board)
+        assert board.patterns.evaluate(board.BLACK) == fresh.evaluate(board.BLACK)
+    while board.history:
+        board.undo_move()
+    assert board.patterns.evaluate(board.BLACK) == PatternEvaluator(board.board).evaluate(board.BLACK)
+
+
+def test_aborted_iteration_falls_back_to_completed_depth():
+    # ノード数の上限で深さ3の反復を打ち切ったときは、読み切った深さ2の手を返す
+    # （この局面では打ち切った反復の途中の最善手が深さ2の手と異なる）
+    board = OthelloBoard()
+    player = board.BLACK
+    for move in [(4, 5), (5, 3), (6, 2), (2, 5)]:
+        board.make_move(*move, player)
+        player = board.WHITE if player == board.BLACK else board.BLACK
+    board.history = []
+    completed = OthelloAI(max_depth=2, max_time=float('inf'))
+    expected = completed.get_move(board, player)
+    aborted = 0
+    for budget in range(completed.nodes + 1, completed.nodes + 200):
+        ai = OthelloAI(max_depth=3, max_nodes=budget)
+        move = ai.get_move(board, player)
+        if ai.last_depth == 2:
+            aborted += 1
+            assert move == expected
+    assert aborted > 0
+
+
+def test_budget_too_small_for_depth_one_still_moves():
+    board = OthelloBoard()
+    ai = OthelloAI(max_depth=4, max_nodes=1)
+    assert ai.get_move(board, board.BLACK) in board.get_valid_moves(board.BLACK)
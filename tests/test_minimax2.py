@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from minimax2 import DECIDED_SCORE, MinimaxAI, OthelloGame, decided_score
+from monte_carlo import legal_moves, play
+from notation import str_to_move
+from stability import random_positions
+
+# 序盤の局面（どちらもまだ勝ち負けが決まるほど石がない）
+OPENINGS = ["", "f5", "f5d6", "f5f6e6f4", "f5d6c3d3c4f4"]
+
+
+def opening_game(moves: str) -> OthelloGame:
+    game = OthelloGame()
+    for i in range(0, len(moves), 2):
+        assert game.make_move(*str_to_move(moves[i:i + 2]))
+        game.switch_player()
+    return game
+
+
+@pytest.mark.parametrize("moves", OPENINGS)
+@pytest.mark.parametrize("options", [{'eval_mode': "disc"}, {'eval_mode': "mobility"},
+                                     {'eval_mode': "disc", 'batch_leaves': True},
+                                     {'eval_mode': "stability", 'stability_cutoff': True}])
+def test_early_position_has_no_decided_score(moves, options):
+    # 手番を交互にして読んでいれば、序盤から終局や確定石による勝敗の値は出てこない
+    game = opening_game(moves)
+    ai = MinimaxAI(4, **options)
+    move = ai.choose_move(game.get_valid_moves(), game)
+    assert move in game.get_valid_moves()
+    assert abs(ai.last_score) < DECIDED_SCORE
+
+
+def test_search_alternates_sides():
+    # 深さ2では黒の初手（石数の差 +3）に白が1つ返して応じるので、差は 0 になる
+    game = OthelloGame()
+    ai = MinimaxAI(2)
+    ai.choose_move(game.get_valid_moves(), game)
+    assert ai.last_score == 0
+
+
+def test_decided_score_is_a_lower_bound_of_the_result():
+    # 確定石で決めた値は、そこから無作為に打ち切った終局の石数の差を超えない
+    rng = random.Random(0)
+    checked = 0
+    for black, white, _ in random_positions(3000, seed=2):
+        score = decided_score(black, white)
+        if score is None:
+            continue
+        checked += 1
+        # 黒から打ち始める（打てなければパス）。play は手番を入れ替える
+        own, opp = black, white
+        black_to_move = True
+        passes = 0
+        while passes < 2:
+            moves = legal_moves(own, opp)
+            if moves:
+                passes = 0
+                own, opp = play(own, opp, rng.choice([i for i in range(64) if moves >> i & 1]))
+            else:
+                passes += 1
+                own, opp = opp, own
+            black_to_move = not black_to_move
+        final_black, final_white = (own, opp) if black_to_move else (opp, own)
+        diff = final_black.bit_count() - final_white.bit_count()
+        if score > 0:
+            assert diff >= score - DECIDED_SCORE
+        else:
+            assert diff <= score + DECIDED_SCORE
+    assert checked > 0
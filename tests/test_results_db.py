@@ -0,0 +1,23 @@
+from results_db import ResultsDB
+
+
+def game(cached=False):
+    result = {'black_score': 40, 'white_score': 24, 'moves': [(2, 3), (2, 2), (3, 2)],
+              'times': [0.5, 0.25, 0.5], 'first_player': 1}
+    if cached:
+        result['cached'] = True
+    return result
+
+
+def test_cached_games_do_not_count_towards_latency():
+    db = ResultsDB(":memory:")
+    tournament = db.start_tournament("a vs b")
+    db.record_game(tournament, "a", "b", game())
+    before = db.latency_percentiles("a", tournament, (50, 100))
+    db.record_game(tournament, "a", "b", dict(game(), times=[30.0, 30.0, 30.0], cached=True))
+    standings = db.standings(tournament)
+    # 対局数には数えるが、思考時間の集計は実際に指した対局だけから求める
+    assert standings["a"]['games'] == 2
+    assert standings["a"]['avg_time'] == 0.5
+    assert db.latency_percentiles("a", tournament, (50, 100)) == before
+    db.close()
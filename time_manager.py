@@ -0,0 +1,68 @@
+from typing import Tuple
+
+# 対局時計と持ち時間の配分
+# 対局全体の持ち時間（と1手ごとの加算）から、その手に使う時間を局面に応じて決める
+
+
+class GameClock:
+    """両者の残り持ち時間（秒）。手を指すたびに消費時間を引き、加算分を足す"""
+
+    def __init__(self, total: float, increment: float = 0.0):
+        self.total = total
+        self.increment = increment
+        self.remaining = {1: total, 2: total}
+
+    def charge(self, player: int, elapsed: float) -> bool:
+        """elapsed 秒を消費する。持ち時間を使い切った（時間切れ負け）なら True"""
+        self.remaining[player] -= elapsed
+        if self.remaining[player] < 0:
+            return True
+        self.remaining[player] += self.increment
+        return False
+
+
+def parse_clock(text: str) -> Tuple[float, float]:
+    """"60" や "60+1"（持ち時間60秒、1手ごとに1秒加算）を (持ち時間, 加算) にする"""
+    total, _, increment = text.partition('+')
+    return float(total), float(increment or 0)
+
+
+class TimeManager:
+    """1手に使う時間を (目安, 上限) で決める
+
+    目安は残り時間を自分の残り手数の見込みで割ったものに、序盤は少なく・中盤は多く
+    する係数と、合法手の数（多いほど判断が難しい）による係数を掛けて求める。
+    探索側は反復深化の区切りで目安を過ぎていれば打ち切り、上限で探索を中断する。
+    合法手が1つなら考えずに指す。
+    """
+
+    def __init__(self, opening_factor: float = 0.6, midgame_factor: float = 1.4,
+                 endgame_factor: float = 1.0, hard_factor: float = 3.0, reserve: float = 0.05):
+        self.opening_factor = opening_factor
+        self.midgame_factor = midgame_factor
+        self.endgame_factor = endgame_factor
+        # 上限は目安の何倍までか
+        self.hard_factor = hard_factor
+        # 時間切れを避けるために使わずに残しておく割合
+        self.reserve = reserve
+
+    def phase_factor(self, empties: int) -> float:
+        if empties > 44:
+            return self.opening_factor
+        if empties > 20:
+            return self.midgame_factor
+        return self.endgame_factor
+
+    def allocate(self, remaining: float, increment: float, empties: int,
+                 legal_moves: int) -> Tuple[float, float]:
+        if legal_moves <= 1:
+            return 0.0, 0.0
+        # 自分が指す残り手数の見込み（空きマスの半分）
+        moves_left = max(empties // 2, 1)
+        usable = remaining * (1 - self.reserve)
+        base = usable / moves_left + increment
+        mobility = min(max(legal_moves / 8, 0.6), 1.5)
+        soft = base * self.phase_factor(empties) * mobility
+        # 上限は1手で残り時間の3割を超えない（加算分は使ってよい）
+        hard = min(soft * self.hard_factor, usable * 0.3 + increment)
+        return min(soft, hard), hard
@@ -0,0 +1,94 @@
+import argparse
+import json
+from typing import List, Tuple
+
+import numpy as np
+
+from pattern_eval import PHASE_BOUNDS
+from selfplay import load_dataset
+
+# 8方向の対称性でまとめたマスの分類（10種類）
+# 分類番号 -> 代表マス (行, 列)、0 <= 行 <= 列 <= 3
+SQUARE_CLASSES: List[Tuple[int, int]] = [(r, c) for r in range(4) for c in range(r, 4)]
+
+
+def _square_class(r: int, c: int) -> int:
+    r, c = min(r, 7 - r), min(c, 7 - c)
+    return SQUARE_CLASSES.index((min(r, c), max(r, c)))
+
+
+# 64マス -> 10分類 の対応行列
+CLASS_MATRIX = np.zeros((64, len(SQUARE_CLASSES)), dtype=np.float64)
+for _r in range(8):
+    for _c in range(8):
+        CLASS_MATRIX[_r * 8 + _c, _square_class(_r, _c)] = 1.0
+
+
+def expand_weights(class_weights: np.ndarray) -> np.ndarray:
+    """10分類の重みを8x8の表に展開する"""
+    return (CLASS_MATRIX @ class_weights).reshape(8, 8)
+
+
+def fit(boards: np.ndarray, labels: np.ndarray, phase_bounds=PHASE_BOUNDS,
+        ridge: float = 1e-3, chunk: int = 1 << 18) -> np.ndarray:
+    """段階ごとに10分類の重みを最小二乗法で求める
+
+    boards は (N, 2, 8, 8) の盤面（黒・白の面）、labels は黒から見た値。
+    メモリマップのままでも扱えるよう、chunk件ずつ正規方程式に足し込む。
+    戻り値は (段階数, 10) の重み。
+    """
+    n_classes = len(SQUARE_CLASSES)
+    n_phases = len(phase_bounds)
+    gram = np.zeros((n_phases, n_classes, n_classes))
+    moment = np.zeros((n_phases, n_classes))
+    bounds = np.asarray(phase_bounds)
+
+    for start in range(0, len(labels), chunk):
+        planes = np.asarray(boards[start:start + chunk], dtype=np.float64).reshape(-1, 2, 64)
+        y = np.asarray(labels[start:start + chunk], dtype=np.float64)
+        diff = planes[:, 0] - planes[:, 1]
+        features = diff @ CLASS_MATRIX
+        discs = planes.sum(axis=(1, 2))
+        phases = np.searchsorted(bounds, discs)
+        for phase in range(n_phases):
+            mask = phases == phase
+            if not mask.any():
+                continue
+            f = features[mask]
+            gram[phase] += f.T @ f
+            moment[phase] += f.T @ y[mask]
+
+    weights = np.zeros((n_phases, n_classes))
+    for phase in range(n_phases):
+        scale = max(np.trace(gram[phase]) / n_classes, 1.0)
+        weights[phase] = np.linalg.solve(gram[phase] + ridge * scale * np.eye(n_classes), moment[phase])
+    return weights
+
+
+def export_table(path: str, weights: np.ndarray, phase_bounds=PHASE_BOUNDS) -> None:
+    """minimax1.load_weight_table で読み込める形式で書き出す"""
+    table = {
+        'phase_bounds': list(phase_bounds),
+        'weights': [expand_weights(w).round(4).tolist() for w in weights],
+    }
+    with open(path, 'w') as f:
+        json.dump(table, f, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="minimax1 の位置の重み表を自己対戦データから調整する")
+    parser.add_argument('dataset', help="selfplay.py で生成したデータセットのディレクトリ")
+    parser.add_argument('output', help="書き出す重み表（JSON）")
+    parser.add_argument('--ridge', type=float, default=1e-3)
+    args = parser.parse_args()
+
+    data = load_dataset(args.dataset)
+    weights = fit(data['boards'], data['label'], ridge=args.ridge)
+    export_table(args.output, weights)
+    for phase, w in enumerate(weights):
+        print(f"phase {phase} (<= {PHASE_BOUNDS[phase]} discs):")
+        print(np.array2string(expand_weights(w), precision=2, max_line_width=120))
+
+
+if __name__ == "__main__":
+    main()